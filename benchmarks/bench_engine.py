@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+CipherForge - Engine Benchmark
+Drives CryptoEngine directly (no GUI) over every algorithm, the text and
+file paths and a range of payload sizes, plus signing and verification on
+their own. Results are written as JSON with the environment they ran in, and
+compare mode flags regressions against a saved baseline.
+
+Usage:
+    python benchmarks/bench_engine.py run [--sizes 64,1K,1M,64M] [--output results.json]
+    python benchmarks/bench_engine.py run --sizes 64,1M,1G,4G --dir /mnt/scratch
+    python benchmarks/bench_engine.py compare baseline.json results.json [--threshold 10]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crypto_engine import CryptoEngine
+
+DEFAULT_SIZES = "64,1K,64K,1M,16M,256M"
+SCHEMA = 1
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+_FILL_BLOCK = 1024 * 1024
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper().rstrip("B").rstrip("I")
+    if text and text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    for unit in ("G", "M", "K"):
+        if size >= _UNITS[unit] and size % _UNITS[unit] == 0:
+            return f"{size // _UNITS[unit]}{unit}"
+    return str(size)
+
+
+def environment() -> dict:
+    import Crypto
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "pycryptodome": Crypto.__version__,
+        "commit": commit,
+    }
+
+
+def _measure(fn, repeat: int, min_time: float) -> list:
+    """Run fn at least repeat times and for at least min_time seconds."""
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < repeat or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _result(case: dict, times: list, size: int = 0, engine=None) -> dict:
+    median = statistics.median(times)
+    result = dict(case)
+    result.update({
+        "runs": len(times),
+        "median_s": median,
+        "min_s": min(times),
+        "max_s": max(times),
+        "ops_per_s": 1 / median if median > 0 else 0.0,
+    })
+    if size:
+        result["mb_per_s"] = size / median / 1e6 if median > 0 else 0.0
+    if engine is not None and engine.history and "metrics" in engine.history[-1]:
+        # Phase breakdown of the last run, as recorded by the engine itself
+        result["phases"] = engine.history[-1]["metrics"]["phases"]
+    return result
+
+
+def _write_payload(path: str, size: int):
+    block = os.urandom(min(size, _FILL_BLOCK))
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining:
+            n = min(remaining, len(block))
+            f.write(block[:n])
+            remaining -= n
+
+
+def bench_text(engine, algorithm: str, size: int, repeat: int, min_time: float) -> list:
+    text = "x" * size
+    base = {"path": "text", "algorithm": algorithm, "size": size}
+    results = [_result(dict(base, op="encrypt"),
+                       _measure(lambda: engine.encrypt_text(algorithm, text), repeat, min_time),
+                       size, engine)]
+    blob = engine.encrypt_text(algorithm, text)
+    results.append(_result(dict(base, op="decrypt"),
+                           _measure(lambda: engine.decrypt_text(blob), repeat, min_time),
+                           size, engine))
+    return results
+
+
+def bench_file(engine, algorithm: str, size: int, work_dir: str, repeat: int, min_time: float) -> list:
+    src = os.path.join(work_dir, f"payload_{size}.bin")
+    _write_payload(src, size)
+    base = {"path": "file", "algorithm": algorithm, "size": size}
+    enc_path = None
+
+    def encrypt():
+        nonlocal enc_path
+        enc_path = engine.encrypt_file(algorithm, src)
+
+    def decrypt():
+        os.remove(engine.decrypt_file(enc_path))
+
+    try:
+        results = [_result(dict(base, op="encrypt"), _measure(encrypt, repeat, min_time), size, engine)]
+        # decrypt_file writes next to the container; move the source away so
+        # the output name does not collide with it.
+        os.remove(src)
+        results.append(_result(dict(base, op="decrypt"), _measure(decrypt, repeat, min_time), size, engine))
+        results.append(_result(
+            dict(base, op="verify"),
+            _measure(lambda: engine.verify_signature_file(enc_path), repeat, min_time), size, engine,
+        ))
+    finally:
+        for path in (src, enc_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+    return results
+
+
+def bench_signatures(key_dir: str, repeat: int, min_time: float) -> list:
+    results = []
+    for scheme in CryptoEngine.SIGNATURE_SCHEMES:
+        engine = CryptoEngine(key_dir=key_dir, signature=scheme)
+        try:
+            engine.wait_for_keys()
+            h = engine._new_hash(scheme, os.urandom(64))
+            signature = engine._sign_hash(h)
+            base = {"path": "signature", "algorithm": scheme, "size": 0}
+            results.append(_result(dict(base, op="sign"),
+                                   _measure(lambda: engine._sign_hash(h), repeat, min_time)))
+            results.append(_result(dict(base, op="verify"),
+                                   _measure(lambda: engine._verify_hash(h, signature, scheme),
+                                            repeat, min_time)))
+        finally:
+            engine.close()
+    return results
+
+
+def run(args) -> dict:
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    algorithms = args.algorithms.split(",") if args.algorithms else CryptoEngine.ALGORITHMS
+    text_limit = parse_size(args.text_limit)
+    results = []
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        key_dir = os.path.join(work_dir, "keys")
+        engine = CryptoEngine(key_dir=key_dir, workers=args.workers)
+        engine.wait_for_keys()
+        try:
+            for algorithm in algorithms:
+                for size in sizes:
+                    if "text" in args.paths and size <= text_limit:
+                        results.extend(bench_text(engine, algorithm, size, args.repeat, args.min_time))
+                        _report(results[-2:])
+                    if "file" in args.paths:
+                        results.extend(bench_file(engine, algorithm, size, work_dir,
+                                                  args.repeat, args.min_time))
+                        _report(results[-3:])
+            if "signature" in args.paths:
+                results.extend(bench_signatures(key_dir, args.repeat, args.min_time))
+                _report(results[-2 * len(CryptoEngine.SIGNATURE_SCHEMES):])
+            settings = {"chunk_size": engine.chunk_size, "workers": engine.workers,
+                        "repeat": args.repeat, "min_time": args.min_time}
+        finally:
+            engine.close()
+
+    return {"schema": SCHEMA, "environment": environment(), "settings": settings,
+            "results": results}
+
+
+def case_id(result: dict) -> str:
+    return f"{result['path']}/{result['op']}/{result['algorithm']}/{format_size(result['size'])}"
+
+
+def _score(result: dict) -> float:
+    """Higher is better: MB/s for payloads, operations/s for sign and verify."""
+    return result.get("mb_per_s", result["ops_per_s"])
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Return (case, baseline score, current score, change %) for every shared case."""
+    base = {case_id(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = case_id(r)
+        if key in base:
+            before, after = _score(base[key]), _score(r)
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((key, before, after, change, change < -threshold))
+    return rows
+
+
+def _report(results: list):
+    """Progress lines go to stderr so JSON on stdout stays parseable."""
+    for r in results:
+        score = f"{r['mb_per_s']:10.1f} MB/s" if "mb_per_s" in r else f"{r['ops_per_s']:10.0f} op/s"
+        print(f"  {case_id(r):<36}{r['median_s'] * 1000:12.3f} ms{score}", file=sys.stderr, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command")
+
+    run_p = sub.add_parser("run", help="run the benchmarks")
+    run_p.add_argument("--sizes", default=DEFAULT_SIZES,
+                       help=f"comma-separated payload sizes, e.g. 64,4K,1M,2G (default {DEFAULT_SIZES})")
+    run_p.add_argument("--algorithms", help="comma-separated subset of the engine's algorithms")
+    run_p.add_argument("--paths", default="text,file,signature",
+                       help="comma-separated subset of text, file and signature")
+    run_p.add_argument("--text-limit", default="64M",
+                       help="largest payload sent through the in-memory text path")
+    run_p.add_argument("--repeat", type=int, default=3, help="minimum runs per case")
+    run_p.add_argument("--min-time", type=float, default=0.5,
+                       help="minimum seconds spent per case; small payloads run many times")
+    run_p.add_argument("--workers", type=int, help="engine chunk workers (default: CPU count)")
+    run_p.add_argument("--dir", help="scratch directory for payload files (default: system temp)")
+    run_p.add_argument("--output", help="write JSON results here (default: stdout)")
+    run_p.add_argument("--baseline", help="compare against this results file when done")
+    run_p.add_argument("--threshold", type=float, default=10.0,
+                       help="percent slowdown flagged as a regression")
+
+    cmp_p = sub.add_parser("compare", help="compare two results files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=10.0,
+                       help="percent slowdown flagged as a regression")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+    elif args.command == "run":
+        current = run(args)
+        text = json.dumps(current, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        if not args.baseline:
+            return
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    else:
+        parser.print_help()
+        return
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"\n{'CASE':<36}{'BASELINE':>12}{'CURRENT':>12}{'CHANGE':>9}")
+    for key, before, after, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{key:<36}{before:>12.4g}{after:>12.4g}{change:>8.1f}%{flag}")
+    regressions = sum(1 for row in rows if row[-1])
+    print(f"\n{len(rows)} cases compared, {regressions} regression(s) beyond {args.threshold:g}%")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
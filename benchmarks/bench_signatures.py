@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+CipherForge - Signature Backend Benchmark
+Measures signs/sec and verifies/sec for each signature scheme.
+
+Usage:
+    python benchmarks/bench_signatures.py [--seconds 2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signatures import BACKENDS
+
+
+def _rate(fn, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def bench(seconds: float = 2.0) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as key_dir:
+        for name, backend_cls in BACKENDS.items():
+            backend = backend_cls(key_dir)
+            start = time.perf_counter()
+            backend.ensure_keys()
+            keygen = time.perf_counter() - start
+
+            h = backend.new_hash(os.urandom(64))
+            signature = backend.sign(h)
+            assert backend.verify(h, signature)
+            results.append({
+                "scheme": name,
+                "keygen_s": keygen,
+                "signs_per_s": _rate(lambda: backend.sign(h), seconds),
+                "verifies_per_s": _rate(lambda: backend.verify(h, signature), seconds),
+                "signature_bytes": len(signature),
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0,
+                        help="time spent measuring each operation")
+    args = parser.parse_args()
+
+    print(f"{'SCHEME':<12}{'KEYGEN':>10}{'SIGN/S':>12}{'VERIFY/S':>12}{'SIG BYTES':>11}")
+    for r in bench(args.seconds):
+        print(f"{r['scheme']:<12}{r['keygen_s'] * 1000:>8.1f}ms{r['signs_per_s']:>12.0f}"
+              f"{r['verifies_per_s']:>12.0f}{r['signature_bytes']:>11}")
+
+
+if __name__ == "__main__":
+    main()
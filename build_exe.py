@@ -5,6 +5,7 @@ Builds the desktop application into a standalone executable using PyInstaller.
 
 Usage:
     python build_exe.py
+    python build_exe.py --startup-profile   # time the built executable's first frame
 
 This creates a dist/CipherForge/ directory with the executable.
 """
@@ -13,6 +14,7 @@ import os
 import sys
 import subprocess
 import platform
+import time
 
 
 def build():
@@ -36,9 +38,26 @@ def build():
         # Add all source files as data
         f"--add-data=theme.py{separator}.",
         f"--add-data=crypto_engine.py{separator}.",
+        f"--add-data=container.py{separator}.",
+        f"--add-data=compression.py{separator}.",
+        f"--add-data=chunk_store.py{separator}.",
+        f"--add-data=tasks.py{separator}.",
+        f"--add-data=signatures.py{separator}.",
+        f"--add-data=history_store.py{separator}.",
+        f"--add-data=keystore.py{separator}.",
+        f"--add-data=sync_index.py{separator}.",
+        f"--add-data=watcher.py{separator}.",
+        f"--add-data=metrics.py{separator}.",
         f"--add-data=panels{separator}panels",
 
         # Hidden imports needed
+        # (panels and Crypto modules are imported lazily, so list them explicitly)
+        "--hidden-import=panels.encrypt_panel",
+        "--hidden-import=panels.decrypt_panel",
+        "--hidden-import=panels.verify_panel",
+        "--hidden-import=panels.keys_panel",
+        "--hidden-import=panels.history_panel",
+        "--hidden-import=panels.metrics_panel",
         "--hidden-import=customtkinter",
         "--hidden-import=pycryptodome",
         "--hidden-import=Crypto",
@@ -47,10 +66,14 @@ def build():
         "--hidden-import=Crypto.Cipher.ChaCha20",
         "--hidden-import=Crypto.PublicKey",
         "--hidden-import=Crypto.PublicKey.RSA",
+        "--hidden-import=Crypto.PublicKey.ECC",
         "--hidden-import=Crypto.Signature",
         "--hidden-import=Crypto.Signature.pkcs1_15",
+        "--hidden-import=Crypto.Signature.eddsa",
+        "--hidden-import=Crypto.Signature.DSS",
         "--hidden-import=Crypto.Hash",
         "--hidden-import=Crypto.Hash.SHA256",
+        "--hidden-import=Crypto.Hash.SHA512",
         "--hidden-import=Crypto.Random",
         "--hidden-import=Crypto.Util.Padding",
 
@@ -93,5 +116,30 @@ def build():
         sys.exit(1)
 
 
+def profile_startup(runs=3):
+    """Launch the built executable with --startup-profile and print its report."""
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    dist_dir = os.path.join(base_dir, "dist", "CipherForge")
+    exe = os.path.join(dist_dir, "CipherForge.exe" if platform.system() == "Windows" else "CipherForge")
+    if not os.path.exists(exe):
+        print(f"  No executable at {exe}; run python build_exe.py first")
+        sys.exit(1)
+
+    report_path = os.path.join(dist_dir, "startup_profile.txt")
+    for run in range(1, runs + 1):
+        if os.path.exists(report_path):
+            os.remove(report_path)
+        start = time.perf_counter()
+        subprocess.run([exe, "--startup-profile"], cwd=dist_dir)
+        wall = (time.perf_counter() - start) * 1000
+        print(f"\nRun {run}: process wall time {wall:.1f} ms (includes bootloader and exit)")
+        if os.path.exists(report_path):
+            with open(report_path) as f:
+                print(f.read().rstrip())
+
+
 if __name__ == "__main__":
-    build()
+    if "--startup-profile" in sys.argv[1:]:
+        profile_startup()
+    else:
+        build()
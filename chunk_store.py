@@ -0,0 +1,130 @@
+"""
+CipherForge - Deduplicating Chunk Store
+Content-defined chunking and a directory of encrypted chunk objects named
+by chunk ID, shared by every backup made from one key_dir.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+MIN_SIZE = 16 * 1024
+MAX_SIZE = 256 * 1024
+READ_SIZE = 4 * 1024 * 1024
+
+# Boundaries are found at C speed in two steps. Every byte is mapped to one
+# bit and a fixed bit pattern marks candidate positions (1 in 64); a
+# candidate is a boundary if the CRC of the WINDOW bytes ending there has
+# its low bits clear (1 in 1024). Both depend only on nearby bytes, so an
+# insertion or deletion moves only the boundaries around it, and chunks
+# average about 64 KiB above MIN_SIZE.
+WINDOW = 48
+_PATTERN = b"101100"
+_CRC_MASK = 0x3FF
+_BITS = bytes(b"01"[b & 1] for b in hashlib.sha256(b"cipherforge-cdc").digest() * 8)
+
+
+def cut_point(data: bytes, bits: bytes, start: int, end: int) -> int:
+    """First boundary in data[start + MIN_SIZE:end], or -1 if there is none.
+
+    bits is data.translate(_BITS); end is at most start + MAX_SIZE.
+    """
+    pos = start + MIN_SIZE - len(_PATTERN)
+    while pos < end:
+        i = bits.find(_PATTERN, pos, end)
+        if i < 0:
+            return -1
+        cut = i + len(_PATTERN)
+        if not zlib.crc32(data[cut - WINDOW:cut]) & _CRC_MASK:
+            return cut
+        pos = i + 1
+    return -1
+
+
+def iter_chunks(f):
+    """Yield the content-defined chunks of binary file object f."""
+    data = b""
+    eof = False
+    while True:
+        while not eof and len(data) < MAX_SIZE + READ_SIZE:
+            block = f.read(READ_SIZE)
+            if not block:
+                eof = True
+            data += block
+        if not data:
+            return
+        bits = data.translate(_BITS)
+        start = 0
+        # Only cut where a full MAX_SIZE window is buffered (or the input
+        # ended), so boundaries do not depend on read sizes.
+        while len(data) - start >= MAX_SIZE or (eof and start < len(data)):
+            end = min(start + MAX_SIZE, len(data))
+            cut = cut_point(data, bits, start, end)
+            if cut < 0:
+                cut = end
+            yield data[start:cut]
+            start = cut
+        data = data[start:]
+        if eof and not data:
+            return
+
+
+class ChunkStore:
+    """Opaque chunk objects stored as root/ab/abcdef... by hex chunk ID.
+
+    Objects are written to a temporary file and renamed, so a concurrent
+    reader never sees a partial object. store.json records the keystore ID
+    of the key the objects are encrypted under.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.config_path = os.path.join(root, "store.json")
+
+    @property
+    def key_id(self):
+        try:
+            with open(self.config_path, "r") as f:
+                return bytes.fromhex(json.load(f)["key_id"])
+        except FileNotFoundError:
+            return None
+
+    def set_key_id(self, key_id: bytes) -> bytes:
+        """Record key_id unless another process got there first; returns the
+        key ID the store actually uses."""
+        fd, tmp_path = tempfile.mkstemp(prefix="store.", suffix=".tmp", dir=self.root)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"key_id": key_id.hex()}, f)
+            # link, unlike rename, fails if store.json already exists.
+            os.link(tmp_path, self.config_path)
+        except FileExistsError:
+            return self.key_id
+        finally:
+            os.remove(tmp_path)
+        return key_id
+
+    def path_for(self, chunk_id: bytes) -> str:
+        name = chunk_id.hex()
+        return os.path.join(self.root, name[:2], name)
+
+    def has(self, chunk_id: bytes) -> bool:
+        return os.path.exists(self.path_for(chunk_id))
+
+    def put(self, chunk_id: bytes, blob: bytes):
+        path = self.path_for(chunk_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{id(blob)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def get(self, chunk_id: bytes) -> bytes:
+        try:
+            with open(self.path_for(chunk_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise ValueError(f"Chunk {chunk_id.hex()} is missing from {self.root}")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+CipherForge - Command Line Interface
+Headless front end to CryptoEngine for servers and shell pipelines; it never
+imports Tk or customtkinter.
+
+Usage:
+    python -m cipherforge encrypt [-a AES-GCM] [FILE|GLOB ...]
+    python -m cipherforge decrypt [FILE|GLOB ...]
+    python -m cipherforge verify  [FILE|GLOB ...]
+    python -m cipherforge sync    SOURCE DEST
+    python -m cipherforge watch   SOURCE DEST
+    python -m cipherforge backup  [-a AES-GCM] FILE|GLOB ...
+    python -m cipherforge archive [-a AES-GCM] DIR ...
+    python -m cipherforge extract [-C DEST] ARCHIVE ...
+    python -m cipherforge bench   [--size 64M]
+
+With no files (or "-") the command streams stdin to stdout chunk by chunk,
+so memory use is constant however large the input:
+
+    tar c dir | python -m cipherforge encrypt > dir.tar.enc
+    python -m cipherforge decrypt < dir.tar.enc | tar x
+
+Exit status is 0 on success, 1 if any operation or signature check failed.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from crypto_engine import DEFAULT_CHUNK_SIZE, CryptoEngine
+
+_BENCH_BLOCK = 1024 * 1024
+
+
+def expand_args(args) -> list:
+    """Expand glob patterns (** included); plain paths and directories pass through."""
+    paths = []
+    for arg in args:
+        if glob.has_magic(arg):
+            matches = sorted(glob.glob(arg, recursive=True))
+            if not matches:
+                raise ValueError(f"No files match {arg}")
+            paths.extend(m for m in matches if os.path.isfile(m))
+        else:
+            paths.append(arg)
+    return paths
+
+
+def _is_stream(files) -> bool:
+    return not files or files == ["-"]
+
+
+def _open_output(path):
+    if path and path != "-":
+        return open(path, "wb")
+    if sys.stdout.isatty():
+        raise ValueError("Refusing to write binary output to a terminal; redirect it or use -o")
+    return sys.stdout.buffer
+
+
+def _report(results) -> int:
+    failed = 0
+    for result in results:
+        if result["status"] == "success":
+            print(f"{result['path']} -> {result['output']}")
+        else:
+            failed += 1
+            print(f"{result['path']}: {result['error']}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def cmd_encrypt(engine, args) -> int:
+    if _is_stream(args.files):
+        out = _open_output(args.output)
+        try:
+            engine.encrypt_stream(args.algorithm, sys.stdin.buffer, out, args.name)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return 0
+    files = []
+    for path in expand_args(args.files):
+        files.extend(_walk_plain(path) if os.path.isdir(path) else [path])
+    return _report(engine.encrypt_many(files, args.algorithm, args.jobs))
+
+
+def cmd_decrypt(engine, args) -> int:
+    if _is_stream(args.files):
+        out = _open_output(args.output)
+        try:
+            engine.decrypt_stream(sys.stdin.buffer, out)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return 0
+    files = []
+    for path in expand_args(args.files):
+        files.extend(_walk_enc(path) if os.path.isdir(path) else [path])
+    return _report(engine.decrypt_many(files, args.jobs))
+
+
+def cmd_verify(engine, args) -> int:
+    if _is_stream(args.files):
+        results = [("-", engine.verify_stream(sys.stdin.buffer))]
+    else:
+        results = []
+        for path in expand_args(args.files):
+            for f in (_walk_enc(path) if os.path.isdir(path) else [path]):
+                results.append((f, engine.verify_signature_file(f)))
+
+    failed = 0
+    for path, result in results:
+        if result["valid"]:
+            print(f"{path}: OK ({result['algorithm']})")
+        else:
+            failed += 1
+            print(f"{path}: FAILED{' - ' + result['error'] if 'error' in result else ''}")
+    return 1 if failed else 0
+
+
+def cmd_sync(engine, args) -> int:
+    summary = engine.sync_folder(args.source, args.dest, args.algorithm, args.jobs)
+    for error in summary["errors"]:
+        print(f"{error['path']}: {error['error']}", file=sys.stderr)
+    print(f"{summary['encrypted']} encrypted, {summary['unchanged']} unchanged, "
+          f"{summary['removed']} removed, {len(summary['errors'])} failed")
+    return 1 if summary["errors"] else 0
+
+
+def cmd_watch(engine, args) -> int:
+    print(f"Watching {args.source} (Ctrl-C to stop)", file=sys.stderr)
+    stop = threading.Event()
+    try:
+        summary = engine.watch_folder(args.source, args.dest, args.algorithm, args.jobs,
+                                      args.queue, stop)
+    except KeyboardInterrupt:
+        return 0
+    for error in summary["errors"]:
+        print(f"{error['path']}: {error['error']}", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+def cmd_backup(engine, args) -> int:
+    return _report(_each(expand_args(args.files),
+                         lambda path: engine.backup_file(args.algorithm, path)))
+
+
+def cmd_archive(engine, args) -> int:
+    return _report(_each(args.dirs, lambda path: engine.encrypt_directory(args.algorithm, path)))
+
+
+def cmd_extract(engine, args) -> int:
+    return _report(_each(expand_args(args.archives),
+                         lambda path: engine.decrypt_directory(path, args.directory)))
+
+
+def _each(paths, fn) -> list:
+    results = []
+    for path in paths:
+        try:
+            results.append({"path": path, "status": "success", "output": fn(path)})
+        except (OSError, ValueError) as e:
+            results.append({"path": path, "status": "failed", "output": None, "error": str(e)})
+    return results
+
+
+def cmd_bench(engine, args) -> int:
+    """Stream a generated payload through each algorithm to a null sink."""
+    size = _parse_size(args.size)
+    print(f"{'ALGORITHM':<20}{'ENCRYPT MB/S':>14}{'DECRYPT MB/S':>14}   "
+          f"({size / 1e6:.0f} MB, {engine.workers} workers)")
+    for algorithm in args.algorithms or engine.ALGORITHMS:
+        # The container goes to an unnamed temp file so large sizes stay off the heap.
+        with tempfile.TemporaryFile() as sealed:
+            start = time.perf_counter()
+            engine.encrypt_stream(algorithm, _PatternReader(size), sealed)
+            enc = time.perf_counter() - start
+
+            sealed.seek(0)
+            start = time.perf_counter()
+            engine.decrypt_stream(sealed, _NullWriter())
+            dec = time.perf_counter() - start
+        print(f"{algorithm:<20}{size / enc / 1e6:>14.1f}{size / dec / 1e6:>14.1f}")
+    print(f"AUTO selects {engine.auto_algorithm()}")
+    return 0
+
+
+def _walk_enc(directory):
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if name.endswith(".enc"):
+                yield os.path.join(root, name)
+
+
+def _walk_plain(directory):
+    """Files below directory, without .enc outputs and temp files."""
+    for root, _, names in os.walk(directory):
+        for name in sorted(names):
+            if not name.endswith((".enc", ".part")):
+                yield os.path.join(root, name)
+
+
+def _parse_size(text: str) -> int:
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper()
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+class _PatternReader:
+    """size bytes of a repeated random block, produced on demand."""
+
+    def __init__(self, size: int):
+        self.remaining = size
+        self.block = os.urandom(_BENCH_BLOCK)
+
+    def read(self, n: int) -> bytes:
+        n = min(n, self.remaining)
+        self.remaining -= n
+        if n <= len(self.block):
+            return self.block[:n]
+        return (self.block * (n // len(self.block) + 1))[:n]
+
+
+class _NullWriter:
+    def write(self, data):
+        return len(data)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cipherforge", description="CipherForge headless encryption tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="With no FILE, or FILE '-', read stdin and write stdout.",
+    )
+    parser.add_argument("--key-dir", help="key directory (default: ~/.cipherforge)")
+    parser.add_argument("--signature", default="RSA", choices=CryptoEngine.SIGNATURE_SCHEMES,
+                        help="signature scheme for new containers")
+    parser.add_argument("--workers", type=int, help="chunk worker threads (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="plaintext bytes per chunk for new containers")
+    parser.add_argument("--compress", choices=CryptoEngine.COMPRESSIONS,
+                        help="compress chunks that will shrink before encrypting them")
+    parser.add_argument("--envelope", action="store_true",
+                        help="wrap each data key with the RSA public key inside the "
+                             "container instead of storing it in keys.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enc = sub.add_parser("encrypt", help="encrypt files or stdin")
+    enc.add_argument("files", nargs="*", help="files, directories or glob patterns")
+    enc.add_argument("-a", "--algorithm", default="AES-GCM",
+                     choices=[CryptoEngine.AUTO] + CryptoEngine.ALGORITHMS,
+                     help="AUTO picks the fastest authenticated cipher on this machine")
+    enc.add_argument("-o", "--output", help="stream mode: write here instead of stdout")
+    enc.add_argument("--name", default="", help="stream mode: filename stored in the container")
+    enc.add_argument("-j", "--jobs", type=int, help="files processed in parallel")
+    enc.set_defaults(func=cmd_encrypt)
+
+    dec = sub.add_parser("decrypt", help="decrypt .enc files or stdin")
+    dec.add_argument("files", nargs="*", help="files, directories or glob patterns")
+    dec.add_argument("-o", "--output", help="stream mode: write here instead of stdout")
+    dec.add_argument("-j", "--jobs", type=int, help="files processed in parallel")
+    dec.set_defaults(func=cmd_decrypt)
+
+    ver = sub.add_parser("verify", help="check signatures of .enc files or stdin")
+    ver.add_argument("files", nargs="*", help="files, directories or glob patterns")
+    ver.set_defaults(func=cmd_verify)
+
+    sync = sub.add_parser("sync", help="encrypt new and changed files of a folder into another")
+    sync.add_argument("source", help="folder to encrypt")
+    sync.add_argument("dest", help="folder that mirrors source as .enc files")
+    sync.add_argument("-a", "--algorithm", default="AES-GCM",
+                      choices=[CryptoEngine.AUTO] + CryptoEngine.ALGORITHMS)
+    sync.add_argument("-j", "--jobs", type=int, help="files processed in parallel")
+    sync.set_defaults(func=cmd_sync)
+
+    watch = sub.add_parser("watch", help="encrypt files as they are written into a folder (Linux)")
+    watch.add_argument("source", help="drop folder to watch")
+    watch.add_argument("dest", help="folder that receives the .enc files")
+    watch.add_argument("-a", "--algorithm", default="AES-GCM",
+                       choices=[CryptoEngine.AUTO] + CryptoEngine.ALGORITHMS)
+    watch.add_argument("-j", "--jobs", type=int, help="files encrypted in parallel")
+    watch.add_argument("--queue", type=int, help="files waiting for a worker before the "
+                                                 "watcher pauses (default 4 per worker)")
+    watch.set_defaults(func=cmd_watch)
+
+    backup = sub.add_parser("backup", help="back up files into the deduplicating chunk store")
+    backup.add_argument("files", nargs="+", help="files or glob patterns")
+    backup.add_argument("-a", "--algorithm", default="AES-GCM",
+                        choices=[CryptoEngine.AUTO] + CryptoEngine.AUTO_CANDIDATES)
+    backup.set_defaults(func=cmd_backup)
+
+    archive = sub.add_parser("archive", help="encrypt each directory into one .tar.enc archive")
+    archive.add_argument("dirs", nargs="+", help="directories to archive")
+    archive.add_argument("-a", "--algorithm", default="AES-GCM",
+                         choices=[CryptoEngine.AUTO] + CryptoEngine.ALGORITHMS)
+    archive.set_defaults(func=cmd_archive)
+
+    extract = sub.add_parser("extract", help="restore directories from .tar.enc archives")
+    extract.add_argument("archives", nargs="+", help="archives or glob patterns")
+    extract.add_argument("-C", "--directory", help="extract here instead of beside the archive")
+    extract.set_defaults(func=cmd_extract)
+
+    bench = sub.add_parser("bench", help="measure streaming throughput per algorithm")
+    bench.add_argument("--size", default="64M", help="payload size, e.g. 16M or 1G")
+    bench.add_argument("-a", "--algorithms", nargs="+", choices=CryptoEngine.ALGORITHMS)
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    engine = CryptoEngine(key_dir=args.key_dir, chunk_size=args.chunk_size,
+                          workers=args.workers, signature=args.signature,
+                          envelope=args.envelope, compression=args.compress)
+    try:
+        return args.func(engine, args)
+    except (ValueError, OSError) as e:
+        print(f"cipherforge: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
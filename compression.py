@@ -0,0 +1,91 @@
+"""
+CipherForge - Compression
+Optional stage applied to each chunk before it is encrypted. Chunks are
+compressed independently, so streaming, parallel workers and byte-range
+reads keep working; a flag byte per chunk says whether it was compressed.
+"""
+
+import bz2
+import lzma
+import math
+import zlib
+
+CODEC_IDS = {"zlib": 1, "lzma": 2, "bz2": 3}
+CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+
+STORED = b"\x00"
+COMPRESSED = b"\x01"
+
+# Shannon entropy (bits per byte) above which a chunk is stored as is:
+# JPEGs, archives and ciphertext sit just under 8, text and CSV around 3-5.
+ENTROPY_LIMIT = 7.5
+SAMPLE_WINDOWS = 4
+SAMPLE_WINDOW = 1024
+
+
+def entropy(data) -> float:
+    """Shannon entropy of data in bits per byte."""
+    if not data:
+        return 0.0
+    total = len(data)
+    counts = [0] * 256
+    for value in set(data):
+        counts[value] = data.count(value)
+    return -sum(c / total * math.log2(c / total) for c in counts if c)
+
+
+def sample(data: bytes) -> bytes:
+    """A few windows spread over data, enough to estimate its entropy."""
+    if len(data) <= SAMPLE_WINDOWS * SAMPLE_WINDOW:
+        return bytes(data)
+    step = (len(data) - SAMPLE_WINDOW) // (SAMPLE_WINDOWS - 1)
+    return b"".join(data[i * step:i * step + SAMPLE_WINDOW] for i in range(SAMPLE_WINDOWS))
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    elif codec == "lzma":
+        return lzma.compress(data, preset=2)
+    elif codec == "bz2":
+        return bz2.compress(data, 9)
+    raise ValueError(f"Unsupported compression: {codec}")
+
+
+def decompress(codec: str, data: bytes, limit=None) -> bytes:
+    """Inverse of compress; refuses to produce more than limit bytes."""
+    if codec not in CODEC_IDS:
+        raise ValueError(f"Unsupported compression: {codec}")
+    try:
+        if codec == "zlib":
+            d = zlib.decompressobj()
+            out = d.decompress(data, limit + 1) if limit is not None else d.decompress(data)
+        else:
+            d = lzma.LZMADecompressor() if codec == "lzma" else bz2.BZ2Decompressor()
+            out = d.decompress(data, -1 if limit is None else limit + 1)
+    except (zlib.error, lzma.LZMAError, OSError) as e:
+        raise ValueError(f"Corrupt compressed chunk: {e}")
+    complete = d.eof
+    if limit is not None and len(out) > limit:
+        raise ValueError("Decompressed chunk is larger than the chunk size")
+    if not complete:
+        raise ValueError("Compressed chunk is truncated")
+    return out
+
+
+def pack(codec: str, data: bytes):
+    """Return (flag, body): the compressed chunk, or the chunk itself when
+    sampling says it will not shrink or compressing did not help."""
+    if entropy(sample(data)) < ENTROPY_LIMIT:
+        packed = compress(codec, data)
+        if len(packed) < len(data):
+            return COMPRESSED, packed
+    return STORED, data
+
+
+def unpack(codec: str, flag: int, body, limit=None) -> bytes:
+    if flag == COMPRESSED[0]:
+        return decompress(codec, bytes(body), limit)
+    if flag != STORED[0]:
+        raise ValueError(f"Unknown chunk flag: {flag}")
+    return body
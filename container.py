@@ -0,0 +1,309 @@
+"""
+CipherForge - Binary Container Format
+Framed on-disk layout for .enc files written by CryptoEngine.
+
+Layout:
+    header   magic, version, algorithm id, flags, signature scheme id,
+             chunk size, signature length, nonce, original filename,
+             u16 length + extension records (type, u16 length, value)
+    body     chunked:  u32 length + payload frames, ended by a zero-length frame
+             otherwise: the raw ciphertext of a single payload
+             compressed containers prefix every payload with a flag byte
+             (1 = compressed before encryption, 0 = stored)
+    trailer  merkle:   per-chunk leaf hashes, u32 leaf count, then a signature
+                       over header + leaf count + Merkle root
+             otherwise: signature (signature length bytes) over header + body
+
+The Merkle trailer lets single chunks be checked against the signed root
+without rehashing the rest of the file.
+
+Containers are binary; base64 armor is only applied by the text path.
+"""
+
+import hashlib
+import struct
+
+import compression
+
+MAGIC = b"CFRG"
+VERSION = 3
+
+ALGORITHM_IDS = {"AES-GCM": 1, "AES-CBC": 2, "ChaCha20": 3, "ChaCha20-Poly1305": 4}
+ALGORITHM_NAMES = {v: k for k, v in ALGORITHM_IDS.items()}
+
+SIGNATURE_IDS = {"RSA": 1, "Ed25519": 2, "ECDSA-P256": 3}
+SIGNATURE_NAMES = {v: k for k, v in SIGNATURE_IDS.items()}
+
+FLAG_CHUNKED = 0x01
+FLAG_MERKLE = 0x02
+# The payload is a backup manifest of chunk-store references, not file data.
+FLAG_MANIFEST = 0x04
+# The payload is a tar stream of a directory tree.
+FLAG_ARCHIVE = 0x08
+
+# Bytes a full chunk grows by when encrypted (the AEAD tag).
+PAYLOAD_OVERHEAD = {"AES-GCM": 16, "ChaCha20-Poly1305": 16}
+
+# Header extension record types
+EXT_KEY_ID = 1
+EXT_WRAPPED_KEY = 2
+EXT_COMPRESSION = 3
+
+# magic, version, algorithm id, flags, signature scheme id, chunk size,
+# signature length, nonce length, filename length
+_HEADER = struct.Struct(">4sBBBBIHBH")
+# Version 1 had no signature scheme id and was always RSA.
+_HEADER_V1 = struct.Struct(">4sBBBIHBH")
+# Version 3 appends extension records after the filename.
+_EXT_LEN = struct.Struct(">H")
+_EXT = struct.Struct(">BH")
+_FRAME = struct.Struct(">I")
+_COUNT = struct.Struct(">I")
+HASH_SIZE = 32
+
+
+class ContainerError(ValueError):
+    """Raised when a container is truncated or malformed."""
+
+
+def is_container(prefix: bytes) -> bool:
+    return prefix[:len(MAGIC)] == MAGIC
+
+
+class Header:
+    def __init__(self, algorithm: str, nonce: bytes, chunk_size: int, sig_len: int,
+                 filename: str = "", flags: int = FLAG_CHUNKED, signature: str = "RSA",
+                 key_id: bytes = b"", wrapped_key: bytes = b"", compression: str = ""):
+        self.algorithm = algorithm
+        self.signature = signature
+        self.nonce = nonce
+        self.chunk_size = chunk_size
+        self.sig_len = sig_len
+        self.filename = filename
+        self.flags = flags
+        # Keystore id of the data key; empty for containers written before
+        # the keystore, which use encryption_key.key.
+        self.key_id = key_id
+        # Envelope containers carry the data key itself, RSA-OAEP wrapped.
+        self.wrapped_key = wrapped_key
+        # Codec chunks were compressed with before encryption, if any.
+        self.compression = compression
+        self.raw = b""
+        # Frame offsets found so far; compressed frames vary in size.
+        self.frame_offsets = []
+
+    @property
+    def chunked(self) -> bool:
+        return bool(self.flags & FLAG_CHUNKED)
+
+    @property
+    def merkle(self) -> bool:
+        return bool(self.flags & FLAG_MERKLE)
+
+    @property
+    def manifest(self) -> bool:
+        return bool(self.flags & FLAG_MANIFEST)
+
+    @property
+    def archive(self) -> bool:
+        return bool(self.flags & FLAG_ARCHIVE)
+
+    def pack(self) -> bytes:
+        if self.algorithm not in ALGORITHM_IDS:
+            raise ValueError(f"Unsupported algorithm: {self.algorithm}")
+        name = self.filename.encode("utf-8")
+        ext = b""
+        if self.key_id:
+            ext += _EXT.pack(EXT_KEY_ID, len(self.key_id)) + self.key_id
+        if self.wrapped_key:
+            ext += _EXT.pack(EXT_WRAPPED_KEY, len(self.wrapped_key)) + self.wrapped_key
+        if self.compression:
+            ext += _EXT.pack(EXT_COMPRESSION, 1) + bytes([compression.CODEC_IDS[self.compression]])
+        self.raw = _HEADER.pack(
+            MAGIC, VERSION, ALGORITHM_IDS[self.algorithm], self.flags,
+            SIGNATURE_IDS[self.signature], self.chunk_size, self.sig_len,
+            len(self.nonce), len(name),
+        ) + self.nonce + name + _EXT_LEN.pack(len(ext)) + ext
+        return self.raw
+
+    @classmethod
+    def read(cls, f) -> "Header":
+        prefix = _read_exact(f, len(MAGIC) + 1)
+        if prefix[:len(MAGIC)] != MAGIC:
+            raise ContainerError("Not a CipherForge container")
+        version = prefix[-1]
+        if version == 1:
+            fixed = prefix + _read_exact(f, _HEADER_V1.size - len(prefix))
+            _, _, algo_id, flags, chunk_size, sig_len, nonce_len, name_len = \
+                _HEADER_V1.unpack(fixed)
+            sig_id = SIGNATURE_IDS["RSA"]
+        elif version in (2, VERSION):
+            fixed = prefix + _read_exact(f, _HEADER.size - len(prefix))
+            _, _, algo_id, flags, sig_id, chunk_size, sig_len, nonce_len, name_len = \
+                _HEADER.unpack(fixed)
+        else:
+            raise ContainerError(f"Unsupported container version: {version}")
+        if algo_id not in ALGORITHM_NAMES:
+            raise ContainerError(f"Unknown algorithm id: {algo_id}")
+        if sig_id not in SIGNATURE_NAMES:
+            raise ContainerError(f"Unknown signature scheme id: {sig_id}")
+        nonce = _read_exact(f, nonce_len)
+        name = _read_exact(f, name_len)
+        header = cls(ALGORITHM_NAMES[algo_id], nonce, chunk_size, sig_len,
+                     name.decode("utf-8"), flags, SIGNATURE_NAMES[sig_id])
+        header.raw = fixed + nonce + name
+        if version >= 3:
+            ext_len = _read_exact(f, _EXT_LEN.size)
+            ext = _read_exact(f, _EXT_LEN.unpack(ext_len)[0])
+            header.raw += ext_len + ext
+            header._read_extensions(ext)
+        return header
+
+    def _read_extensions(self, ext: bytes):
+        pos = 0
+        while pos < len(ext):
+            if pos + _EXT.size > len(ext):
+                raise ContainerError("Malformed header extension")
+            kind, length = _EXT.unpack_from(ext, pos)
+            pos += _EXT.size
+            value = ext[pos:pos + length]
+            if len(value) != length:
+                raise ContainerError("Malformed header extension")
+            pos += length
+            # Unknown record types are skipped; they are still covered by the signature.
+            if kind == EXT_KEY_ID:
+                self.key_id = value
+            elif kind == EXT_WRAPPED_KEY:
+                self.wrapped_key = value
+            elif kind == EXT_COMPRESSION:
+                if len(value) != 1 or value[0] not in compression.CODEC_NAMES:
+                    raise ContainerError("Unknown compression codec")
+                self.compression = compression.CODEC_NAMES[value[0]]
+
+
+def write_frame(f, payload: bytes, h=None):
+    prefix = _FRAME.pack(len(payload))
+    f.write(prefix)
+    f.write(payload)
+    if h is not None:
+        h.update(prefix)
+        h.update(payload)
+
+
+def write_end(f, h=None):
+    end = _FRAME.pack(0)
+    f.write(end)
+    if h is not None:
+        h.update(end)
+
+
+def read_frames(f, h=None):
+    """Yield (index, payload, is_last) for each frame, hashing raw bytes into h."""
+    index = 0
+    current = _read_frame(f, h)
+    while current:
+        following = _read_frame(f, h)
+        yield index, current, not following
+        index += 1
+        current = following
+
+
+def seek_frame(f, header: Header, index: int) -> int:
+    """Seek to the payload of chunk index and return its length.
+
+    Every frame before the last holds a full chunk, so the position is
+    computed from the header alone. Compressed frames vary in size and are
+    found by walking the frame lengths (remembered on the header).
+    """
+    full = header.chunk_size + PAYLOAD_OVERHEAD.get(header.algorithm, 0)
+    if not header.compression:
+        f.seek(len(header.raw) + index * (_FRAME.size + full))
+    else:
+        full += 1
+        offsets = header.frame_offsets or [len(header.raw)]
+        header.frame_offsets = offsets
+        while len(offsets) <= index:
+            f.seek(offsets[-1])
+            (length,) = _FRAME.unpack(_read_exact(f, _FRAME.size))
+            if length == 0:
+                raise ContainerError(f"Chunk index out of range: {index}")
+            offsets.append(offsets[-1] + _FRAME.size + length)
+        f.seek(offsets[index])
+    (length,) = _FRAME.unpack(_read_exact(f, _FRAME.size))
+    if not 0 < length <= full + 16:
+        raise ContainerError(f"Bad frame length for chunk {index}")
+    return length
+
+
+def read_frame_at(f, header: Header, index: int) -> bytes:
+    return _read_exact(f, seek_frame(f, header, index))
+
+
+def leaf_hash(payload: bytes) -> bytes:
+    h = hashlib.sha256(b"\x00")
+    h.update(payload)
+    return h.digest()
+
+
+def merkle_root(leaves) -> bytes:
+    """Root of a binary hash tree; an odd node is promoted to the next level."""
+    level = list(leaves)
+    if not level:
+        return hashlib.sha256(b"").digest()
+    while len(level) > 1:
+        paired = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+                  for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def signed_root(header_raw: bytes, leaves) -> bytes:
+    """The message signed for a Merkle container."""
+    return header_raw + _COUNT.pack(len(leaves)) + merkle_root(leaves)
+
+
+def write_leaves(f, leaves):
+    f.write(b"".join(leaves))
+    f.write(_COUNT.pack(len(leaves)))
+
+
+def read_leaves(f, count: int) -> list:
+    """Read the leaf table that follows the end frame when reading sequentially."""
+    data = _read_exact(f, count * HASH_SIZE)
+    (stored,) = _COUNT.unpack(_read_exact(f, _COUNT.size))
+    if stored != count:
+        raise ContainerError("Chunk count does not match the leaf table")
+    return [data[i:i + HASH_SIZE] for i in range(0, len(data), HASH_SIZE)]
+
+
+def read_trailer(f, header: Header):
+    """Seek to the end of a Merkle container and return (leaves, signature)."""
+    f.seek(0, 2)
+    end = f.tell()
+    f.seek(end - header.sig_len - _COUNT.size)
+    (count,) = _COUNT.unpack(_read_exact(f, _COUNT.size))
+    start = end - header.sig_len - _COUNT.size - count * HASH_SIZE
+    if start < len(header.raw):
+        raise ContainerError("Container is truncated")
+    f.seek(start)
+    leaves = read_leaves(f, count)
+    return leaves, _read_exact(f, header.sig_len)
+
+
+def _read_frame(f, h):
+    prefix = _read_exact(f, _FRAME.size)
+    (length,) = _FRAME.unpack(prefix)
+    payload = _read_exact(f, length)
+    if h is not None:
+        h.update(prefix)
+        h.update(payload)
+    return payload
+
+
+def _read_exact(f, n: int) -> bytes:
+    data = f.read(n)
+    if len(data) != n:
+        raise ContainerError("Container is truncated")
+    return data
@@ -1,259 +1,1902 @@
 """
 CipherForge - Comprehensive Encryption Engine
-Supports AES-GCM, AES-CBC, ChaCha20 with RSA-2048 digital signatures.
+Supports AES-GCM, AES-CBC, ChaCha20 with RSA-2048, Ed25519 or ECDSA P-256
+digital signatures.
 """
 
 import os
 import base64
+import contextlib
+import functools
+import hashlib
+import hmac
+import io
+import itertools
 import json
+import platform
+import queue
+import shutil
+import struct
+import tarfile
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
 
-from Crypto.Cipher import AES, ChaCha20
-from Crypto.PublicKey import RSA
-from Crypto.Signature import pkcs1_15
-from Crypto.Hash import SHA256
+# Crypto.Cipher is imported where a cipher is first built: loading its native
+# modules is the largest part of import time and the GUI does not need it
+# before the first frame.
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 
+import chunk_store
+import compression
+import container
+import metrics
+import signatures
+from history_store import HistoryStore
+from keystore import KeyCache, KeyStore
+from sync_index import SyncIndex
+from watcher import FolderWatch
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Per-file nonce material for chunked containers. Each chunk derives its own
+# nonce/IV from this and its index (see _encrypt_chunk).
+_CHUNK_NONCE_SIZES = {"AES-GCM": 8, "AES-CBC": 12, "ChaCha20": 8, "ChaCha20-Poly1305": 8}
+
+# Authenticated modes: each chunk carries a 16-byte tag.
+_AEAD = {"AES-GCM", "ChaCha20-Poly1305"}
+
+# Backup manifest: total size and chunk count, then (chunk id, length) per chunk.
+_MANIFEST = struct.Struct(">QI")
+_MANIFEST_REF = struct.Struct(">32sI")
+
+# Buffer size of the tar stream between the archiver thread and the cipher.
+_TAR_BUFSIZE = 1024 * 1024
+
+# Ciphertext is hashed in slices of this size right after the cipher touches
+# it, while it is still in cache.
+_HASH_SLICE = 64 * 1024
+
+_BLOCK_SIZE = 16
+
+
+def _chunk_cipher(algorithm: str, key: bytes, nonce: bytes, index: int, chunk_size: int):
+    from Crypto.Cipher import AES, ChaCha20, ChaCha20_Poly1305
+
+    if algorithm == "AES-GCM":
+        return AES.new(key, AES.MODE_GCM, nonce=nonce + struct.pack(">I", index))
+    elif algorithm == "ChaCha20-Poly1305":
+        return ChaCha20_Poly1305.new(key=key, nonce=nonce + struct.pack(">I", index))
+    elif algorithm == "AES-CBC":
+        iv = AES.new(key, AES.MODE_ECB).encrypt(nonce + struct.pack(">I", index))
+        return AES.new(key, AES.MODE_CBC, iv=iv)
+    elif algorithm == "ChaCha20":
+        cipher = ChaCha20.new(key=key, nonce=nonce)
+        cipher.seek(index * chunk_size)
+        return cipher
+    else:
+        raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+
+def _encrypt_chunk(algorithm: str, key: bytes, nonce: bytes, index: int,
+                   chunk_size: int, data: bytes, last: bool, h=None, padded=False):
+    """Encrypt one chunk. When h is given, ciphertext is fed to it slice by
+    slice as it is produced, so it is never walked a second time. CBC pads
+    the last chunk, or every chunk when padded is set."""
+    cipher = _chunk_cipher(algorithm, key, nonce, index, chunk_size)
+    if algorithm in _AEAD:
+        # The final-chunk marker is authenticated so truncation is detected.
+        cipher.update(b"\x01" if last else b"\x00")
+    elif algorithm == "AES-CBC" and (last or padded):
+        data = pad(data, _BLOCK_SIZE)
+
+    tag_size = 16 if algorithm in _AEAD else 0
+    out = bytearray(len(data) + tag_size)
+    _crypt_slices(cipher.encrypt, memoryview(data), memoryview(out)[:len(data)], h)
+    if tag_size:
+        out[len(data):] = cipher.digest()
+        if h is not None:
+            h.update(out[len(data):])
+    return out
+
+
+def _decrypt_chunk(algorithm: str, key: bytes, nonce: bytes, index: int,
+                   chunk_size: int, payload: bytes, last: bool, h=None, padded=False):
+    """Decrypt one chunk, feeding the ciphertext to h (if given) as it is consumed."""
+    cipher = _chunk_cipher(algorithm, key, nonce, index, chunk_size)
+    tag_size = 16 if algorithm in _AEAD else 0
+    if tag_size:
+        cipher.update(b"\x01" if last else b"\x00")
+
+    view = memoryview(payload)
+    body = view[:len(view) - tag_size]
+    out = bytearray(len(body))
+    _crypt_slices(cipher.decrypt, body, memoryview(out), h, hash_src=True)
+    if tag_size:
+        if h is not None:
+            h.update(view[len(body):])
+        try:
+            cipher.verify(view[len(body):])
+        except ValueError:
+            raise ValueError(f"Chunk {index} failed authentication")
+    elif algorithm == "AES-CBC" and (last or padded):
+        return unpad(out, _BLOCK_SIZE)
+    return out
+
+
+def _crypt_slices(fn, src, dst, h, hash_src=False):
+    """Run the cipher fn from src into dst, hashing the ciphertext side
+    (dst when encrypting, src when decrypting) one slice at a time."""
+    if h is None:
+        fn(src, output=dst)
+        return
+    for i in range(0, len(src), _HASH_SLICE):
+        fn(src[i:i + _HASH_SLICE], output=dst[i:i + _HASH_SLICE])
+        h.update((src if hash_src else dst)[i:i + _HASH_SLICE])
+
+
+def _encrypt_chunk_leaf(*args):
+    leaf = hashlib.sha256(b"\x00")
+    payload = _encrypt_chunk(*args, h=leaf)
+    return payload, leaf.digest()
+
+
+def _decrypt_chunk_leaf(*args):
+    leaf = hashlib.sha256(b"\x00")
+    data = _decrypt_chunk(*args, h=leaf)
+    return data, leaf.digest()
+
+
+def _encrypt_chunk_packed(algorithm, key, nonce, index, chunk_size, data, last, codec):
+    """Compress a chunk (when it pays off), then encrypt it behind its flag byte.
+
+    Compressed chunks have any length, so CBC pads every one of them; the
+    other ciphers never produce more than chunk_size bytes of ciphertext.
+    """
+    flag, body = compression.pack(codec, data)
+    leaf = hashlib.sha256(b"\x00" + flag)
+    payload = _encrypt_chunk(algorithm, key, nonce, index, chunk_size, body, last,
+                             h=leaf, padded=True)
+    return flag + payload, leaf.digest()
+
+
+def _decrypt_chunk_packed(algorithm, key, nonce, index, chunk_size, payload, last, codec):
+    leaf = hashlib.sha256(b"\x00" + payload[:1])
+    body = _decrypt_chunk(algorithm, key, nonce, index, chunk_size, memoryview(payload)[1:],
+                          last, h=leaf, padded=True)
+    return compression.unpack(codec, payload[0], body, chunk_size), leaf.digest()
+
+
+def _chunk_encryptor(codec: str):
+    """Worker function for one chunk: (payload, leaf hash) from a chunk job."""
+    if codec:
+        return functools.partial(_encrypt_chunk_packed, codec=codec)
+    return _encrypt_chunk_leaf
+
+
+def _chunk_decryptor(header):
+    if header.compression:
+        return functools.partial(_decrypt_chunk_packed, codec=header.compression)
+    return _decrypt_chunk_leaf
+
+
+class OperationCancelled(Exception):
+    """Raised when an operation is stopped through its cancel event."""
+
+
+def _instrumented(method):
+    """Time a public engine operation; _log attaches the result to its entry.
+
+    The timer lives in a thread-local, so batch workers each time their own
+    file and nested calls (decrypt_file -> _decrypt_file) share one.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if getattr(self._local, "timer", None) is not None:
+            return method(self, *args, **kwargs)
+        self._local.timer = metrics.PhaseTimer()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._local.timer = None
+    return wrapper
+
+
+def _monitor(items, size_of, total, progress=None, cancel=None):
+    """Pass items through, checking cancel before each and reporting
+    progress(done_bytes, total_bytes) after each."""
+    if progress is None and cancel is None:
+        yield from items
+        return
+    done = 0
+    for item in items:
+        if cancel is not None and cancel.is_set():
+            raise OperationCancelled("Operation cancelled")
+        yield item
+        done += size_of(item)
+        if progress is not None:
+            progress(done, total)
+
+
+def _stream_size(f):
+    try:
+        return os.fstat(f.fileno()).st_size or None
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+class _ChunkReader:
+    """Iterate (index, data, is_last) over a file object, counting bytes read.
+
+    Empty input is an error unless allow_empty is set; it then yields nothing.
+    """
+
+    def __init__(self, src, chunk_size: int, allow_empty: bool = False):
+        self.src = src
+        self.chunk_size = chunk_size
+        self.allow_empty = allow_empty
+        self.total = 0
+
+    def __iter__(self):
+        data = self.src.read(self.chunk_size)
+        if not data and not self.allow_empty:
+            raise ValueError("File is empty")
+        index = 0
+        while data:
+            # Read one chunk ahead so the final chunk can be marked/padded.
+            following = self.src.read(self.chunk_size)
+            self.total += len(data)
+            yield index, data, not following
+            index += 1
+            data = following
+
+
+class _HashingReader:
+    """Pass reads through from f, feeding the bytes to hash object h."""
+
+    def __init__(self, f, h):
+        self.f = f
+        self.h = h
+
+    def read(self, n=-1):
+        data = self.f.read(n)
+        self.h.update(data)
+        return data
+
+    def fileno(self):
+        return self.f.fileno()
+
+
+class _CountingWriter:
+    """Pass writes through to f, counting the bytes."""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self.f.write(data)
+
+
+class _RangeSink:
+    """Write target that keeps only bytes [offset, offset + length) of a stream."""
+
+    def __init__(self, offset: int, length: int):
+        self.offset = offset
+        self.end = offset + length
+        self.pos = 0
+        self.buf = io.BytesIO()
+
+    def write(self, data: bytes):
+        start = max(self.offset - self.pos, 0)
+        stop = min(self.end - self.pos, len(data))
+        if start < stop:
+            self.buf.write(data[start:stop])
+        self.pos += len(data)
+
+    def getvalue(self) -> bytes:
+        return self.buf.getvalue()
+
+
+def _cipher_throughput(algorithm: str, size: int, min_time: float) -> float:
+    """Single-thread MB/s of _encrypt_chunk on size bytes, run for min_time."""
+    key = get_random_bytes(32)
+    nonce = get_random_bytes(_CHUNK_NONCE_SIZES[algorithm])
+    data = bytes(size)
+    _encrypt_chunk(algorithm, key, nonce, 0, size, data, False)  # warm up
+    done = 0
+    start = time.perf_counter()
+    while True:
+        _encrypt_chunk(algorithm, key, nonce, 0, size, data, False)
+        done += size
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed / 1e6
+
+
+def _machine_fingerprint() -> dict:
+    """What a cipher benchmark result depends on; a change means re-measuring."""
+    import Crypto
+
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "pycryptodome": Crypto.__version__,
+    }
+
 
 class CryptoEngine:
-    ALGORITHMS = ["AES-GCM", "AES-CBC", "ChaCha20"]
+    ALGORITHMS = ["AES-GCM", "AES-CBC", "ChaCha20", "ChaCha20-Poly1305"]
+    # Pseudo-algorithm resolved to the fastest of AUTO_CANDIDATES on this machine.
+    AUTO = "AUTO"
+    AUTO_CANDIDATES = ["AES-GCM", "ChaCha20-Poly1305"]
+    SPEED_SAMPLE = 1024 * 1024
+    SPEED_TIME = 0.05
+    SIGNATURE_SCHEMES = list(signatures.BACKENDS)
+    COMPRESSIONS = list(compression.CODEC_IDS)
+    # Recent entries kept in memory; the full log is in history.db.
+    HISTORY_LIMIT = 10000
 
-    def __init__(self, key_dir=None):
+    def __init__(self, key_dir=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+                 signature="RSA", envelope=False, compression=None):
+        if chunk_size <= 0 or chunk_size % _BLOCK_SIZE:
+            raise ValueError(f"Chunk size must be a positive multiple of {_BLOCK_SIZE}")
+        if signature not in signatures.BACKENDS:
+            raise ValueError(f"Unsupported signature scheme: {signature}")
+        if compression and compression not in self.COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.chunk_size = chunk_size
+        # Chunks are independent, so they are encrypted on a thread pool;
+        # pycryptodome releases the GIL inside its C primitives.
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._chunk_pool = None
+        # Batch workers share the pool; only one of them may create it.
+        self._pool_lock = threading.Lock()
         self.key_dir = key_dir or os.path.join(os.path.expanduser("~"), ".cipherforge")
         os.makedirs(self.key_dir, exist_ok=True)
-        self.private_key_path = os.path.join(self.key_dir, "private_key.pem")
-        self.public_key_path = os.path.join(self.key_dir, "public_key.pem")
+        self.signature = signature
+        # Envelope mode wraps each data key with the RSA public key and
+        # stores it in the container, so no key file is shared.
+        self.envelope = envelope
+        # Codec for new containers (None to store chunks as they are); each
+        # chunk is only compressed if sampling says it will shrink.
+        self.compression = compression or ""
+        self._backends = {}
+        self.private_key_path = self._signer().private_key_path
+        self.public_key_path = self._signer().public_key_path
+        # Data keys live in the keystore under the ID recorded in each
+        # container; encryption_key.key is only read for older containers.
+        self.keystore = KeyStore(self.key_dir)
+        self._close_keystore = weakref.finalize(self, self.keystore.close)
+        # Unwrapped envelope keys by wrapped key: repeat decrypts skip RSA.
+        self._unwrapped = KeyCache(KeyStore.CACHE_SIZE)
+        self.speeds_path = os.path.join(self.key_dir, "cipher_speeds.json")
+        # Deduplicating backup store, opened on first use (see _chunks()).
+        self._chunk_store = None
+        self._chunk_keys = None
+        self._chunk_lock = threading.Lock()
+        # Decrypted output names handed out but not yet written (see _decrypted_path).
+        self._claimed = set()
+        self._claim_lock = threading.Lock()
+        self._speeds = None
+        self._speeds_lock = threading.Lock()
         self.enc_key_path = os.path.join(self.key_dir, "encryption_key.key")
-        self.history = []
-        self._ensure_rsa_keys()
+        self.history = deque(maxlen=self.HISTORY_LIMIT)
+        self._history_lock = threading.Lock()
+        self.metrics = metrics.MetricsRegistry()
+        self._local = threading.local()
+        self.history_store = HistoryStore(os.path.join(self.key_dir, "history.db"))
+        # Commits queued history rows even if close() is never called.
+        self._close_store = weakref.finalize(self, self.history_store.close)
+        self._keys_ready = self._start_keygen()
+
+    def _start_keygen(self) -> Future:
+        """Generate missing signing (and envelope) keys on a background thread.
+
+        Key generation (RSA-2048 in particular) can take seconds, so it must
+        not hold up construction; signing and verification wait on the
+        returned future instead.
+        """
+        future = Future()
+        backends = [self._signer()]
+        if self.envelope and self.signature != "RSA":
+            backends.append(self._backend("RSA"))
+        if all(backend.has_keys() for backend in backends):
+            future.set_result(None)
+            return future
+
+        def generate():
+            try:
+                for backend in backends:
+                    backend.ensure_keys()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        threading.Thread(target=generate, name="cipherforge-keygen", daemon=True).start()
+        return future
+
+    def keys_ready(self) -> bool:
+        return self._keys_ready.done()
 
-    def _ensure_rsa_keys(self):
-        if not os.path.exists(self.private_key_path) or not os.path.exists(self.public_key_path):
-            key = RSA.generate(2048)
-            with open(self.private_key_path, "wb") as f:
-                f.write(key.export_key())
-            with open(self.public_key_path, "wb") as f:
-                f.write(key.publickey().export_key())
+    def wait_for_keys(self, timeout=None):
+        """Block until the signing keys exist; re-raises a key generation error."""
+        self._keys_ready.result(timeout)
 
     def get_public_key(self) -> str:
-        with open(self.public_key_path, "r") as f:
+        self.wait_for_keys()
+        with open(self._signer().public_key_path, "r") as f:
             return f.read()
 
-    def _get_cipher(self, algorithm: str, key: bytes):
-        if algorithm == "AES-GCM":
-            nonce = get_random_bytes(12)
-            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
-            return cipher, nonce
-        elif algorithm == "AES-CBC":
-            iv = get_random_bytes(AES.block_size)
-            cipher = AES.new(key, AES.MODE_CBC, iv=iv)
-            return cipher, iv
-        elif algorithm == "ChaCha20":
-            cipher = ChaCha20.new(key=key)
-            return cipher, cipher.nonce
-        else:
-            raise ValueError(f"Unsupported algorithm: {algorithm}")
+    def _backend(self, scheme: str):
+        backend = self._backends.get(scheme)
+        if backend is None:
+            if scheme not in signatures.BACKENDS:
+                raise ValueError(f"Unsupported signature scheme: {scheme}")
+            backend = self._backends.setdefault(scheme, signatures.BACKENDS[scheme](self.key_dir))
+        return backend
+
+    def _signer(self):
+        return self._backend(self.signature)
+
+    def reload_keys(self):
+        """Drop cached signing keys so the next operation re-reads the PEM files."""
+        for backend in list(self._backends.values()):
+            backend.reload()
+
+    def _signature_size(self) -> int:
+        # RSA reads the size off the private key, so this is where it is loaded.
+        with self._phase("key_load"):
+            self.wait_for_keys()
+            return self._signer().signature_size()
+
+    def _new_hash(self, scheme: str, data: bytes = b""):
+        """Hash object for the digest signed under scheme."""
+        return self._backend(scheme).new_hash(data)
 
     def _sign_data(self, data: bytes) -> bytes:
-        with open(self.private_key_path, "r") as f:
-            key = RSA.import_key(f.read())
-        h = SHA256.new(data)
-        return pkcs1_15.new(key).sign(h)
+        return self._sign_hash(self._new_hash(self.signature, data))
+
+    def _sign_hash(self, h) -> bytes:
+        signer = self._signer()
+        with self._phase("key_load"):
+            self.wait_for_keys()
+            signer.load()
+        with self._phase("sign"):
+            return signer.sign(h)
 
     def _verify_sig(self, data: bytes, signature: bytes) -> bool:
-        with open(self.public_key_path, "r") as f:
-            key = RSA.import_key(f.read())
-        h = SHA256.new(data)
+        """Verify a legacy envelope signature (always RSA over the ciphertext)."""
+        return self._verify_hash(self._new_hash("RSA", data), signature, "RSA")
+
+    def _verify_hash(self, h, signature: bytes, scheme: str) -> bool:
+        backend = self._backend(scheme)
+        with self._phase("key_load"):
+            if scheme == self.signature:
+                self.wait_for_keys()
+            backend.load(private=False)
+        with self._phase("verify"):
+            return backend.verify(h, signature)
+
+    def _phase(self, name: str):
+        """Charge the enclosed time to a phase of the current operation."""
+        timer = getattr(self._local, "timer", None)
+        return timer.phase(name) if timer is not None else contextlib.nullcontext()
+
+    def _timed(self, name: str, iterable):
+        """Charge the time spent producing each item of iterable to a phase."""
+        timer = getattr(self._local, "timer", None)
+        return timer.iterate(name, iterable) if timer is not None else iterable
+
+    def close(self):
+        """Shut down worker threads owned by the engine and flush history."""
+        with self._pool_lock:
+            pool, self._chunk_pool = self._chunk_pool, None
+        if pool is not None:
+            pool.shutdown()
+        self._close_store()
+        self._close_keystore()
+
+    def _map_chunks(self, fn, jobs, parallel=True):
+        """Yield fn(*job) for each job in order, running up to self.workers at once.
+
+        At most 2 * workers chunks are in flight, so memory stays bounded.
+        """
+        if self.workers == 1 or not parallel:
+            for job in jobs:
+                yield fn(*job)
+            return
+
+        with self._pool_lock:
+            if self._chunk_pool is None:
+                self._chunk_pool = ThreadPoolExecutor(self.workers,
+                                                      thread_name_prefix="cipherforge-chunk")
+            pool = self._chunk_pool
+        pending = deque()
         try:
-            pkcs1_15.new(key).verify(h, signature)
+            for job in jobs:
+                pending.append(pool.submit(fn, *job))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def cipher_speeds(self, refresh: bool = False) -> dict:
+        """Single-thread encryption MB/s per algorithm on this machine.
+
+        Measured once (about SPEED_TIME seconds per algorithm) and cached in
+        cipher_speeds.json in key_dir; the cache is ignored when the machine,
+        Python or pycryptodome changes, or when refresh is set.
+        """
+        with self._speeds_lock:
+            if self._speeds is not None and not refresh:
+                return dict(self._speeds)
+            fingerprint = _machine_fingerprint()
+            speeds = None
+            if not refresh:
+                try:
+                    with open(self.speeds_path, "r") as f:
+                        cached = json.load(f)
+                    if (cached.get("fingerprint") == fingerprint
+                            and set(cached.get("mb_per_s", ())) == set(self.ALGORITHMS)):
+                        speeds = cached["mb_per_s"]
+                except (OSError, ValueError):
+                    pass
+            if speeds is None:
+                speeds = {a: round(_cipher_throughput(a, self.SPEED_SAMPLE, self.SPEED_TIME), 1)
+                          for a in self.ALGORITHMS}
+                tmp_path = None
+                try:
+                    tmp_path = _temp_path(self.speeds_path)
+                    with open(tmp_path, "w") as f:
+                        json.dump({"fingerprint": fingerprint, "mb_per_s": speeds,
+                                   "measured": datetime.now().strftime("%Y-%m-%d %H:%M:%S")},
+                                  f, indent=2)
+                    os.replace(tmp_path, self.speeds_path)
+                except OSError:
+                    # Only a cache: another process's measurement will do.
+                    if tmp_path is not None:
+                        _remove_quietly(tmp_path)
+            self._speeds = speeds
+            return dict(speeds)
+
+    def auto_algorithm(self) -> str:
+        """The fastest authenticated algorithm according to cipher_speeds()."""
+        speeds = self.cipher_speeds()
+        return max(self.AUTO_CANDIDATES, key=lambda a: speeds.get(a, 0.0))
+
+    def resolve_algorithm(self, algorithm: str) -> str:
+        """Map AUTO to a concrete algorithm and reject unknown names."""
+        if algorithm == self.AUTO:
+            with self._phase("select"):
+                return self.auto_algorithm()
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        return algorithm
+
+    def _read_key(self) -> bytes:
+        """The single key that containers without a key ID were encrypted under."""
+        if not os.path.exists(self.enc_key_path):
+            raise ValueError("No encryption key found. Encrypt something first.")
+        with self._phase("key_load"), open(self.enc_key_path, "rb") as f:
+            return f.read()
+
+    def _new_data_key(self):
+        """A fresh data key and the header fields that let it be recovered."""
+        if not self.envelope:
+            key_id, key = self.keystore.new_key()
+            return key, {"key_id": key_id}
+        key = get_random_bytes(32)
+        with self._phase("key_wrap"):
+            self.wait_for_keys()
+            wrapped = self._backend("RSA").wrap(key)
+        self._unwrapped.put(wrapped, key)
+        return key, {"wrapped_key": wrapped}
+
+    def _key_for(self, header) -> bytes:
+        if header.wrapped_key:
+            key = self._unwrapped.get(header.wrapped_key)
+            if key is None:
+                with self._phase("key_wrap"):
+                    self.wait_for_keys()
+                    key = self._backend("RSA").unwrap(header.wrapped_key)
+                self._unwrapped.put(header.wrapped_key, key)
+            return key
+        if not header.key_id:
+            return self._read_key()
+        with self._phase("key_load"):
+            return self.keystore.get(header.key_id)
+
+    def _commit_key(self, key_ref: dict):
+        """Wait for the keystore to persist a new key before output is published."""
+        if "key_id" in key_ref:
+            with self._phase("write"):
+                self.keystore.wait_durable(key_ref["key_id"])
+
+    def _encrypt_stream(self, algorithm: str, key: bytes, src, dst, filename: str = "",
+                        parallel=True, progress=None, cancel=None, key_ref=None,
+                        flags: int = 0, allow_empty: bool = False) -> int:
+        """Encrypt src into dst chunk by chunk. Returns the plaintext byte count.
+
+        With allow_empty, empty input gives a container with no chunks.
+        """
+        nonce = get_random_bytes(_CHUNK_NONCE_SIZES[algorithm])
+        header = container.Header(algorithm, nonce, self.chunk_size, self._signature_size(),
+                                  filename, container.FLAG_CHUNKED | container.FLAG_MERKLE | flags,
+                                  self.signature, compression=self.compression, **(key_ref or {}))
+        dst.write(header.pack())
+
+        # Leaf hashes are computed on the workers alongside each chunk.
+        reader = _ChunkReader(src, self.chunk_size, allow_empty)
+        chunks = _monitor(self._timed("read", reader), lambda c: len(c[1]),
+                          _stream_size(src), progress, cancel)
+        jobs = ((algorithm, key, nonce, index, self.chunk_size, data, last)
+                for index, data, last in chunks)
+        leaves = []
+        encrypt = _chunk_encryptor(self.compression)
+        for payload, leaf in self._timed("cipher", self._map_chunks(encrypt, jobs, parallel)):
+            with self._phase("write"):
+                container.write_frame(dst, payload)
+            leaves.append(leaf)
+        with self._phase("write"):
+            container.write_end(dst)
+            container.write_leaves(dst, leaves)
+
+        signature = self._sign_data(container.signed_root(header.raw, leaves))
+        with self._phase("write"):
+            dst.write(signature)
+        return reader.total
+
+    def _decrypt_stream(self, header, key: bytes, src, dst, parallel=True,
+                        progress=None, cancel=None) -> bool:
+        """Decrypt the body following header into dst. Returns signature validity."""
+        h = self._new_hash(header.signature, header.raw)
+        if not header.chunked:
+            with self._phase("read"):
+                payload, signature = _split_trailer(src.read(), header.sig_len)
+            flag = payload[:1] if header.compression else b""
+            h.update(flag)
+            # Hash while decrypting; plaintext is only released once the
+            # signature checks out, and a signature failure takes precedence
+            # over a tag or padding error.
+            try:
+                with self._phase("cipher"):
+                    data, error = _decrypt_chunk(header.algorithm, key, header.nonce, 0, 0,
+                                                 payload[len(flag):], True, h), None
+            except ValueError as e:
+                data, error = None, e
+            if not self._verify_hash(h, signature, header.signature):
+                return False
+            if error is not None:
+                raise error
+            if flag:
+                with self._phase("cipher"):
+                    data = compression.unpack(header.compression, flag[0], data)
+            with self._phase("write"):
+                dst.write(data)
             return True
-        except (ValueError, TypeError):
+
+        frames = _monitor(self._timed("read", container.read_frames(src, None if header.merkle else h)),
+                          lambda fr: len(fr[1]), _stream_size(src), progress, cancel)
+        jobs = ((header.algorithm, key, header.nonce, index, header.chunk_size, payload, last)
+                for index, payload, last in frames)
+        leaves = []
+        decrypt = _chunk_decryptor(header)
+        for data, leaf in self._timed("cipher", self._map_chunks(decrypt, jobs, parallel)):
+            with self._phase("write"):
+                dst.write(data)
+            leaves.append(leaf)
+        return self._check_chunked_trailer(header, src, h, leaves)
+
+    def _hash_stream(self, header, src, progress=None, cancel=None) -> bool:
+        """Check the signature of a container without decrypting it."""
+        h = self._new_hash(header.signature, header.raw)
+        if not header.chunked:
+            with self._phase("read"):
+                payload, signature = _split_trailer(src.read(), header.sig_len)
+            with self._phase("hash"):
+                h.update(payload)
+            return self._verify_hash(h, signature, header.signature)
+
+        frames = _monitor(self._timed("read", container.read_frames(src, None if header.merkle else h)),
+                          lambda fr: len(fr[1]), _stream_size(src), progress, cancel)
+        leaves = list(self._timed("hash", self._map_chunks(
+            container.leaf_hash, ((payload,) for _, payload, _ in frames))))
+        return self._check_chunked_trailer(header, src, h, leaves)
+
+    def _check_chunked_trailer(self, header, src, h, leaves: list) -> bool:
+        """Verify the trailer after the end frame; h holds the linear hash of
+        header and frames for containers written without a Merkle tree."""
+        if not header.merkle:
+            return self._verify_hash(h, src.read(header.sig_len), header.signature)
+        if container.read_leaves(src, len(leaves)) != leaves:
             return False
+        signature = src.read(header.sig_len)
+        return self._verify_root(header, leaves, signature)
+
+    def _verify_root(self, header, leaves: list, signature: bytes) -> bool:
+        h = self._new_hash(header.signature, container.signed_root(header.raw, leaves))
+        return self._verify_hash(h, signature, header.signature)
+
+    def _verify_chunks(self, header, f, chunks) -> bool:
+        """Check selected chunks against the signed Merkle root only."""
+        leaves, signature = container.read_trailer(f, header)
+        if not self._verify_root(header, leaves, signature):
+            return False
+        for index in chunks:
+            if not 0 <= index < len(leaves):
+                raise ValueError(f"Chunk index out of range: {index}")
+            if container.leaf_hash(container.read_frame_at(f, header, index)) != leaves[index]:
+                return False
+        return True
+
+    def _seal(self, algorithm: str, key: bytes, data: bytes, key_ref=None,
+              filename: str = "", flags: int = 0) -> bytes:
+        """Encrypt an in-memory payload into a single-shot (unchunked) container."""
+        nonce = get_random_bytes(_CHUNK_NONCE_SIZES[algorithm])
+        header = container.Header(algorithm, nonce, 0, self._signature_size(), filename, flags,
+                                  signature=self.signature, compression=self.compression,
+                                  **(key_ref or {}))
+        h = self._new_hash(self.signature, header.pack())
+        with self._phase("cipher"):
+            flag = b""
+            if self.compression:
+                flag, data = compression.pack(self.compression, data)
+                h.update(flag)
+            payload = _encrypt_chunk(algorithm, key, nonce, 0, 0, data, True, h)
+        return b"".join((header.raw, flag, payload, self._sign_hash(h)))
 
-    def _log(self, action: str, algorithm: str, input_type: str, status: str, details: str = ""):
-        self.history.insert(0, {
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
+    def _log(self, action: str, algorithm: str, input_type: str, status: str, details: str = "",
+             size: int = 0):
+        """Record an operation; size is the bytes it processed (for throughput)."""
+        entry = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "action": action,
             "algorithm": algorithm,
             "input_type": input_type,
             "status": status,
             "details": details,
-        })
-        if len(self.history) > 100:
-            self.history = self.history[:100]
+        }
+        timer = getattr(self._local, "timer", None)
+        if timer is not None:
+            entry["metrics"] = timer.snapshot(size)
+            self.metrics.record(action, algorithm, status, entry["metrics"])
+        with self._history_lock:
+            self.history.append(entry)
+        self.history_store.append(entry)
 
-    def encrypt_text(self, algorithm: str, plaintext: str) -> str:
+    @_instrumented
+    def encrypt_text(self, algorithm: str, plaintext: str, armor: bool = False):
+        """Encrypt text into a binary container, or a base64 string when armor is set."""
         if not plaintext.strip():
             raise ValueError("Input text is empty")
+        algorithm = self.resolve_algorithm(algorithm)
 
-        key = get_random_bytes(32)
-        cipher, nonce_or_iv = self._get_cipher(algorithm, key)
+        key, key_ref = self._new_data_key()
         data = plaintext.encode("utf-8")
+        blob = self._seal(algorithm, key, data, key_ref)
+        self._commit_key(key_ref)
 
-        if algorithm == "AES-CBC":
-            encrypted_data = cipher.encrypt(pad(data, AES.block_size))
-        else:
-            encrypted_data = cipher.encrypt(data)
+        if armor:
+            with self._phase("encode"):
+                blob = base64.b64encode(blob).decode("ascii")
+        self._log("encrypt", algorithm, "text", "success", f"Encrypted {len(data)} bytes",
+                  size=len(data))
+        return blob
 
-        signature = self._sign_data(encrypted_data)
+    @_instrumented
+    def decrypt_text(self, ciphertext) -> str:
+        """Decrypt a binary container, its base64 armor, or a legacy envelope."""
+        with self._phase("encode"):
+            raw = _unarmor(ciphertext)
+        if not container.is_container(raw):
+            return self._decrypt_text_legacy(self._read_key(), raw)
 
-        output = {
-            "algorithm": algorithm,
-            "nonce_or_iv": base64.b64encode(nonce_or_iv).decode("utf-8"),
-            "ciphertext": base64.b64encode(encrypted_data).decode("utf-8"),
-            "signature": base64.b64encode(signature).decode("utf-8"),
-        }
+        src = io.BytesIO(raw)
+        header = container.Header.read(src)
+        _reject_manifest(header)
+        key = self._key_for(header)
+        out = io.BytesIO()
+        if not self._decrypt_stream(header, key, src, out):
+            self._log("decrypt", header.algorithm, "text", "failed", "Signature verification failed")
+            raise ValueError("Digital signature verification failed!")
+
+        decrypted = out.getvalue()
+        self._log("decrypt", header.algorithm, "text", "success", f"Decrypted {len(decrypted)} bytes",
+                  size=len(decrypted))
+        return decrypted.decode("utf-8")
 
-        output_str = base64.b64encode(json.dumps(output).encode("utf-8")).decode("utf-8")
+    def _decrypt_text_legacy(self, key: bytes, raw: bytes) -> str:
+        """Read the base64/JSON envelope written before the binary container."""
+        with self._phase("encode"):
+            encrypted_data = json.loads(raw.decode("utf-8"))
+            algorithm = encrypted_data["algorithm"]
+            nonce_or_iv = base64.b64decode(encrypted_data["nonce_or_iv"])
+            ct = base64.b64decode(encrypted_data["ciphertext"])
+            sig = base64.b64decode(encrypted_data["signature"])
 
-        with open(self.enc_key_path, "wb") as f:
-            f.write(key)
+        if not self._verify_sig(ct, sig):
+            self._log("decrypt", algorithm, "text", "failed", "Signature verification failed")
+            raise ValueError("Digital signature verification failed!")
 
-        self._log("encrypt", algorithm, "text", "success", f"Encrypted {len(data)} bytes")
-        return output_str
+        with self._phase("cipher"):
+            decrypted = _decrypt_legacy(algorithm, key, nonce_or_iv, ct)
+        self._log("decrypt", algorithm, "text", "success", f"Decrypted {len(ct)} bytes",
+                  size=len(ct))
+        return decrypted.decode("utf-8")
 
-    def decrypt_text(self, ciphertext_b64: str) -> str:
-        if not os.path.exists(self.enc_key_path):
-            raise ValueError("No encryption key found. Encrypt something first.")
+    @_instrumented
+    def encrypt_file(self, algorithm: str, filepath: str, progress=None, cancel=None) -> str:
+        """Encrypt a file to <name>.enc next to it.
 
-        with open(self.enc_key_path, "rb") as f:
-            key = f.read()
+        progress(done_bytes, total_bytes) is called from the calling thread as
+        chunks are read; setting the cancel event (a threading.Event) stops
+        the operation between chunks with OperationCancelled.
+        """
+        algorithm = self.resolve_algorithm(algorithm)
 
-        encrypted_data = json.loads(base64.b64decode(ciphertext_b64).decode("utf-8"))
-        algorithm = encrypted_data["algorithm"]
-        nonce_or_iv = base64.b64decode(encrypted_data["nonce_or_iv"])
-        ct = base64.b64decode(encrypted_data["ciphertext"])
-        sig = base64.b64decode(encrypted_data["signature"])
+        key, key_ref = self._new_data_key()
+        return self._encrypt_file_with_key(algorithm, key, key_ref, filepath,
+                                           progress=progress, cancel=cancel)
 
-        if not self._verify_sig(ct, sig):
-            self._log("decrypt", algorithm, "text", "failed", "Signature verification failed")
+    @_instrumented
+    def _encrypt_file_with_key(self, algorithm: str, key: bytes, key_ref: dict, filepath: str,
+                               parallel=True, progress=None, cancel=None, out_path=None,
+                               h=None, action: str = "encrypt", allow_empty: bool = False) -> str:
+        """Encrypt filepath to out_path (default: beside it, extension .enc),
+        feeding the plaintext to hash object h if one is given."""
+        out_path = out_path or os.path.splitext(filepath)[0] + ".enc"
+        tmp_path = _temp_path(out_path)
+
+        try:
+            with open(filepath, "rb") as src, open(tmp_path, "wb") as dst:
+                if h is not None:
+                    src = _HashingReader(src, h)
+                size = self._encrypt_stream(algorithm, key, src, dst, os.path.basename(filepath),
+                                            parallel, progress, cancel, key_ref,
+                                            allow_empty=allow_empty)
+            self._commit_key(key_ref)
+        except BaseException as e:
+            _remove_quietly(tmp_path)
+            if isinstance(e, OperationCancelled):
+                self._log(action, algorithm, "file", "cancelled", os.path.basename(filepath))
+            raise
+        os.replace(tmp_path, out_path)
+
+        self._log(action, algorithm, "file", "success",
+                  f"{os.path.basename(filepath)} ({size} bytes)", size=size)
+        return out_path
+
+    @_instrumented
+    def backup_file(self, algorithm: str, filepath: str, progress=None, cancel=None) -> str:
+        """Back up a file into the deduplicating chunk store; returns its manifest.
+
+        The file is split into content-defined chunks (about 64 KiB). Chunks
+        not already in the store are encrypted into it once; the file itself
+        becomes a small signed container (.cfm) listing its chunk IDs, so a
+        new version of a file costs only the chunks that changed. Restore it
+        with decrypt_file. algorithm must be an authenticated one (or AUTO).
+        """
+        algorithm = self.resolve_algorithm(algorithm)
+        if algorithm not in _AEAD:
+            raise ValueError(f"Backups need an authenticated algorithm, not {algorithm}")
+        store, id_key, enc_key = self._chunks()
+
+        def put(data):
+            chunk_id = hmac.digest(id_key, data, "sha256")
+            if store.has(chunk_id):
+                return chunk_id, len(data), False
+            body = compression.STORED + data
+            if self.compression:
+                flag, packed = compression.pack(self.compression, data)
+                if flag == compression.COMPRESSED:
+                    body = bytes([compression.CODEC_IDS[self.compression]]) + packed
+            nonce = get_random_bytes(_CHUNK_NONCE_SIZES[algorithm])
+            # Keys are per chunk, derived from its ID, so random nonces never repeat under one key.
+            key = hmac.digest(enc_key, chunk_id, "sha256")
+            store.put(chunk_id, bytes([container.ALGORITHM_IDS[algorithm]]) + nonce
+                      + _encrypt_chunk(algorithm, key, nonce, 0, 0, body, True))
+            return chunk_id, len(data), True
+
+        refs = []
+        new = new_bytes = 0
+        with open(filepath, "rb") as src:
+            chunks = _monitor(self._timed("read", chunk_store.iter_chunks(src)), len,
+                              _stream_size(src), progress, cancel)
+            for chunk_id, length, stored in self._timed(
+                    "cipher", self._map_chunks(put, ((data,) for data in chunks))):
+                refs.append(_MANIFEST_REF.pack(chunk_id, length))
+                if stored:
+                    new += 1
+                    new_bytes += length
+        size = sum(_MANIFEST_REF.unpack(ref)[1] for ref in refs)
+        manifest = _MANIFEST.pack(size, len(refs)) + b"".join(refs)
+
+        key, key_ref = self._new_data_key()
+        blob = self._seal(algorithm, key, manifest, key_ref, os.path.basename(filepath),
+                          container.FLAG_MANIFEST)
+        self._commit_key(key_ref)
+        out_path = os.path.splitext(filepath)[0] + ".cfm"
+        with self._phase("write"):
+            tmp_path = _temp_path(out_path)
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, out_path)
+
+        self._log("backup", algorithm, "file", "success",
+                  f"{os.path.basename(filepath)} ({size} bytes, {len(refs)} chunks, "
+                  f"{new} new, {new_bytes} bytes stored)", size=size)
+        return out_path
+
+    def _chunks(self):
+        """The chunk store with its ID and encryption keys, set up on first use."""
+        with self._chunk_lock:
+            if self._chunk_store is None:
+                store = chunk_store.ChunkStore(os.path.join(self.key_dir, "chunks"))
+                key_id = store.key_id
+                if key_id is None:
+                    key_id, key = self.keystore.new_key()
+                    self.keystore.wait_durable(key_id)
+                    stored = store.set_key_id(key_id)
+                    if stored != key_id:
+                        # Another process set the store up first; use its key.
+                        key_id, key = stored, self.keystore.get(stored)
+                else:
+                    key = self.keystore.get(key_id)
+                self._chunk_keys = (hmac.digest(key, b"chunk-id", "sha256"),
+                                    hmac.digest(key, b"chunk-encryption", "sha256"))
+                self._chunk_store = store
+            return (self._chunk_store,) + self._chunk_keys
+
+    def _restore_backup(self, header, key: bytes, src, dst, parallel=True,
+                        progress=None, cancel=None) -> bool:
+        """Write the file a backup manifest describes; False if its signature fails."""
+        manifest = io.BytesIO()
+        if not self._decrypt_stream(header, key, src, manifest):
+            return False
+        manifest = manifest.getvalue()
+        size, count = _MANIFEST.unpack_from(manifest)
+        if len(manifest) != _MANIFEST.size + count * _MANIFEST_REF.size:
+            raise ValueError("Backup manifest is malformed")
+        refs = [_MANIFEST_REF.unpack_from(manifest, _MANIFEST.size + i * _MANIFEST_REF.size)
+                for i in range(count)]
+        store, id_key, enc_key = self._chunks()
+
+        def get(chunk_id, length):
+            blob = store.get(chunk_id)
+            algorithm = container.ALGORITHM_NAMES.get(blob[0])
+            if algorithm not in _AEAD:
+                raise ValueError(f"Chunk {chunk_id.hex()} is malformed")
+            nonce_len = _CHUNK_NONCE_SIZES[algorithm]
+            try:
+                body = _decrypt_chunk(algorithm, hmac.digest(enc_key, chunk_id, "sha256"),
+                                      blob[1:1 + nonce_len], 0, 0, blob[1 + nonce_len:], True)
+            except ValueError:
+                raise ValueError(f"Chunk {chunk_id.hex()} failed authentication")
+            if body[0]:
+                data = compression.decompress(compression.CODEC_NAMES.get(body[0], ""),
+                                              bytes(body[1:]), length)
+            else:
+                data = body[1:]
+            if len(data) != length or hmac.digest(id_key, data, "sha256") != chunk_id:
+                raise ValueError(f"Chunk {chunk_id.hex()} does not match the manifest")
+            return data
+
+        jobs = _monitor(refs, lambda ref: ref[1], size, progress, cancel)
+        for data in self._timed("cipher", self._map_chunks(get, jobs, parallel)):
+            with self._phase("write"):
+                dst.write(data)
+        return True
+
+    @_instrumented
+    def decrypt_file(self, enc_filepath: str, progress=None, cancel=None) -> str:
+        """Decrypt an .enc file next to it; progress and cancel as for encrypt_file."""
+        return self._decrypt_file(enc_filepath, progress=progress, cancel=cancel)
+
+    @_instrumented
+    def _decrypt_file(self, enc_filepath: str, parallel=True, progress=None, cancel=None) -> str:
+        with open(enc_filepath, "rb") as src:
+            if not container.is_container(src.read(len(container.MAGIC))):
+                return self._decrypt_file_legacy(self._read_key(), enc_filepath)
+            src.seek(0)
+            header = container.Header.read(src)
+            key = self._key_for(header)
+            original_name = os.path.basename(header.filename) or "decrypted_file"
+            out_path = self._decrypted_path(enc_filepath, original_name)
+            try:
+                tmp_path = _temp_path(out_path)
+                try:
+                    with open(tmp_path, "wb") as dst:
+                        if header.manifest:
+                            valid = self._restore_backup(header, key, src, dst, parallel,
+                                                         progress, cancel)
+                        else:
+                            valid = self._decrypt_stream(header, key, src, dst, parallel,
+                                                         progress, cancel)
+                        size = dst.tell()
+                except BaseException as e:
+                    _remove_quietly(tmp_path)
+                    status = "cancelled" if isinstance(e, OperationCancelled) else "failed"
+                    self._log("decrypt", header.algorithm, "file", status, str(e))
+                    raise
+
+                if not valid:
+                    _remove_quietly(tmp_path)
+                    self._log("decrypt", header.algorithm, "file", "failed",
+                              "Signature verification failed")
+                    raise ValueError("Digital signature verification failed!")
+
+                os.replace(tmp_path, out_path)
+            finally:
+                self._release(out_path)
+        self._log("decrypt", header.algorithm, "file", "success", f"{original_name}", size=size)
+        return out_path
+
+    @_instrumented
+    def decrypt_range(self, enc_filepath: str, offset: int, length: int, verify: bool = True) -> bytes:
+        """Decrypt plaintext bytes [offset, offset + length) of an encrypted file.
+
+        Only the chunks covering the range are read and decrypted. With verify,
+        they are checked against the signed Merkle root; without it, ChaCha20
+        files are decrypted straight from the keystream offset of the range.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("Offset and length must be non-negative")
+
+        with open(enc_filepath, "rb") as f:
+            if not container.is_container(f.read(len(container.MAGIC))):
+                raise ValueError("Byte-range decryption requires a CipherForge container")
+            f.seek(0)
+            header = container.Header.read(f)
+            _reject_manifest(header)
+            key = self._key_for(header)
+            if header.merkle:
+                data = self._decrypt_chunk_range(header, key, f, offset, length, verify)
+            else:
+                # No chunk index to seek with: stream the whole body, keep the range.
+                sink = _RangeSink(offset, length)
+                if not self._decrypt_stream(header, key, f, sink):
+                    self._log("decrypt", header.algorithm, "range", "failed",
+                              "Signature verification failed")
+                    raise ValueError("Digital signature verification failed!")
+                data = sink.getvalue()
+
+        self._log("decrypt", header.algorithm, "range", "success",
+                  f"{os.path.basename(enc_filepath)} [{offset}:{offset + len(data)}]", size=len(data))
+        return data
+
+    def _decrypt_chunk_range(self, header, key: bytes, f, offset: int, length: int,
+                             verify: bool) -> bytes:
+        leaves, signature = container.read_trailer(f, header)
+        if verify and not self._verify_root(header, leaves, signature):
+            self._log("decrypt", header.algorithm, "range", "failed", "Signature verification failed")
             raise ValueError("Digital signature verification failed!")
 
-        if algorithm == "AES-GCM":
-            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce_or_iv)
-            decrypted = cipher.decrypt(ct)
-        elif algorithm == "AES-CBC":
-            cipher = AES.new(key, AES.MODE_CBC, iv=nonce_or_iv)
-            decrypted = unpad(cipher.decrypt(ct), AES.block_size)
-        elif algorithm == "ChaCha20":
-            cipher = ChaCha20.new(key=key, nonce=nonce_or_iv)
-            decrypted = cipher.decrypt(ct)
-        else:
-            raise ValueError("Unsupported algorithm")
+        cs = header.chunk_size
+        first = offset // cs
+        stop = min(len(leaves), -(-(offset + length) // cs))
+        if length == 0 or first >= stop:
+            return b""
 
-        self._log("decrypt", algorithm, "text", "success", f"Decrypted {len(ct)} bytes")
-        return decrypted.decode("utf-8")
+        if not verify and header.algorithm == "ChaCha20" and not header.compression:
+            from Crypto.Cipher import ChaCha20
 
-    def encrypt_file(self, algorithm: str, filepath: str) -> str:
-        with open(filepath, "rb") as f:
-            data = f.read()
+            cipher = ChaCha20.new(key=key, nonce=header.nonce)
+            parts = []
+            for index in range(first, stop):
+                frame_len = container.seek_frame(f, header, index)
+                start = max(offset - index * cs, 0)
+                end = min(offset + length - index * cs, frame_len)
+                if start >= end:
+                    # The range starts past the end of the last chunk.
+                    break
+                f.seek(start, 1)
+                cipher.seek(index * cs + start)
+                parts.append(cipher.decrypt(f.read(end - start)))
+            return b"".join(parts)
 
-        if not data:
-            raise ValueError("File is empty")
+        jobs = ((header.algorithm, key, header.nonce, index, cs,
+                 container.read_frame_at(f, header, index), index == len(leaves) - 1)
+                for index in range(first, stop))
+        parts = []
+        for index, (part, leaf) in enumerate(self._map_chunks(_chunk_decryptor(header), jobs), first):
+            if verify and leaf != leaves[index]:
+                raise ValueError(f"Chunk {index} failed verification")
+            parts.append(part)
+        data = b"".join(parts)
+        start = offset - first * cs
+        return data[start:start + length]
 
-        key = get_random_bytes(32)
-        cipher, nonce_or_iv = self._get_cipher(algorithm, key)
+    @_instrumented
+    def encrypt_stream(self, algorithm: str, src, dst, filename: str = "",
+                       progress=None, cancel=None) -> int:
+        """Encrypt a binary stream (a pipe such as stdin works) into dst.
 
-        if algorithm == "AES-CBC":
-            encrypted_data = cipher.encrypt(pad(data, AES.block_size))
-        else:
-            encrypted_data = cipher.encrypt(data)
+        Chunks are read, encrypted and written as they arrive, so memory use
+        does not depend on the input size. Returns the plaintext byte count.
+        """
+        algorithm = self.resolve_algorithm(algorithm)
 
-        signature = self._sign_data(encrypted_data)
+        key, key_ref = self._new_data_key()
+        # An empty pipe is valid input: it round-trips as a zero-chunk container.
+        size = self._encrypt_stream(algorithm, key, src, dst, filename,
+                                    progress=progress, cancel=cancel, key_ref=key_ref,
+                                    allow_empty=True)
+        self._commit_key(key_ref)
+        self._log("encrypt", algorithm, "stream", "success", f"{size} bytes", size=size)
+        return size
 
-        output = {
-            "algorithm": algorithm,
-            "nonce_or_iv": base64.b64encode(nonce_or_iv).decode("utf-8"),
-            "ciphertext": base64.b64encode(encrypted_data).decode("utf-8"),
-            "signature": base64.b64encode(signature).decode("utf-8"),
-            "original_filename": os.path.basename(filepath),
-        }
+    @_instrumented
+    def decrypt_stream(self, src, dst, progress=None, cancel=None) -> int:
+        """Decrypt a container read from a binary stream into dst.
 
-        output_str = base64.b64encode(json.dumps(output).encode("utf-8")).decode("utf-8")
+        Plaintext is written as each chunk is decrypted, before the trailing
+        signature has been read: if this raises, discard what was written.
+        Returns the plaintext byte count.
+        """
+        header = container.Header.read(src)
+        _reject_manifest(header)
+        key = self._key_for(header)
+        counter = _CountingWriter(dst)
+        try:
+            valid = self._decrypt_stream(header, key, src, counter, progress=progress, cancel=cancel)
+        except BaseException as e:
+            status = "cancelled" if isinstance(e, OperationCancelled) else "failed"
+            self._log("decrypt", header.algorithm, "stream", status, str(e))
+            raise
+        if not valid:
+            self._log("decrypt", header.algorithm, "stream", "failed", "Signature verification failed")
+            raise ValueError("Digital signature verification failed!")
+        self._log("decrypt", header.algorithm, "stream", "success", f"{counter.count} bytes",
+                  size=counter.count)
+        return counter.count
+
+    @_instrumented
+    def verify_stream(self, src, progress=None, cancel=None) -> dict:
+        """Verify the signature of a container read from a binary stream."""
+        try:
+            header = container.Header.read(src)
+            is_valid = self._hash_stream(header, src, progress, cancel)
+        except OperationCancelled:
+            self._log("verify", "unknown", "stream", "cancelled")
+            raise
+        except Exception as e:
+            self._log("verify", "unknown", "stream", "error", str(e))
+            return {"valid": False, "algorithm": "unknown", "error": str(e)}
+        self._log("verify", header.algorithm, "stream", "success" if is_valid else "failed",
+                  "Valid" if is_valid else "Invalid")
+        return {"valid": is_valid, "algorithm": header.algorithm}
+
+    @_instrumented
+    def encrypt_directory(self, algorithm: str, path: str, progress=None, cancel=None) -> str:
+        """Encrypt a directory tree into a single <name>.tar.enc archive beside it.
+
+        The tree is written as a tar stream by a helper thread straight into
+        the chunk encryptor through a pipe, so the tar never touches the disk
+        and at most a few chunks of it are in memory.
+        """
+        algorithm = self.resolve_algorithm(algorithm)
+        # realpath, so "." and "dir/" are named after the folder itself.
+        root = os.path.realpath(path)
+        if not os.path.isdir(root):
+            raise ValueError(f"Not a directory: {path}")
+        name = os.path.basename(root)
+        if not name:
+            raise ValueError("Cannot archive the filesystem root")
+        out_path = root + ".tar.enc"
 
-        with open(self.enc_key_path, "wb") as f:
-            f.write(key)
+        key, key_ref = self._new_data_key()
+        tmp_path = _temp_path(out_path)
+        r, w = os.pipe()
+        try:
+            with os.fdopen(r, "rb") as reader, open(tmp_path, "wb") as dst:
+                archived = _start_piped(_write_tar, os.fdopen(w, "wb"), root)
+                try:
+                    size = self._encrypt_stream(algorithm, key, reader, dst, name + ".tar",
+                                                progress=progress, cancel=cancel,
+                                                key_ref=key_ref, flags=container.FLAG_ARCHIVE)
+                except BaseException as e:
+                    reader.close()
+                    _raise_piped(archived, e)
+                    raise
+                entries = archived.result()
+            self._commit_key(key_ref)
+        except BaseException as e:
+            _remove_quietly(tmp_path)
+            status = "cancelled" if isinstance(e, OperationCancelled) else "failed"
+            self._log("encrypt", algorithm, "folder", status, str(e))
+            raise
+        os.replace(tmp_path, out_path)
+
+        self._log("encrypt", algorithm, "folder", "success",
+                  f"{name} ({entries} entries, {size} bytes)", size=size)
+        return out_path
+
+    @_instrumented
+    def decrypt_directory(self, enc_filepath: str, dest_dir=None, progress=None,
+                          cancel=None) -> str:
+        """Extract an archive from encrypt_directory into dest_dir (default:
+        beside it) while it is decrypted; returns the restored directory.
 
-        # Save encrypted file
-        out_path = os.path.splitext(filepath)[0] + ".enc"
-        with open(out_path, "w") as f:
-            f.write(output_str)
+        Entries are extracted into a hidden staging directory as chunks are
+        decrypted, and only moved into place once the signature checks out.
+        """
+        dest_dir = dest_dir or os.path.dirname(os.path.abspath(enc_filepath))
+        with open(enc_filepath, "rb") as src:
+            header = container.Header.read(src)
+            if not header.archive:
+                raise ValueError("Not a directory archive; decrypt it with decrypt_file")
+            key = self._key_for(header)
+            name = os.path.splitext(os.path.basename(header.filename))[0]
+            staging = tempfile.mkdtemp(prefix=".cipherforge-", dir=dest_dir)
 
-        self._log("encrypt", algorithm, "file", "success",
-                  f"{os.path.basename(filepath)} ({len(data)} bytes)")
+            try:
+                r, w = os.pipe()
+                writer = os.fdopen(w, "wb")
+                extracted = _start_piped(_extract_tar, os.fdopen(r, "rb"), staging)
+                counter = _CountingWriter(writer)
+                try:
+                    try:
+                        valid = self._decrypt_stream(header, key, src, counter,
+                                                     progress=progress, cancel=cancel)
+                        writer.close()
+                    except BaseException as e:
+                        with contextlib.suppress(OSError):
+                            writer.close()
+                        _raise_piped(extracted, e)
+                        raise
+                    entries = extracted.result()
+                    if not valid:
+                        raise ValueError("Digital signature verification failed!")
+                    restored = os.path.join(staging, name)
+                    if not name or not os.path.isdir(restored):
+                        raise ValueError("Archive does not contain the directory it names")
+                    out_path = self._new_directory(dest_dir, name)
+                    for entry in os.listdir(restored):
+                        os.replace(os.path.join(restored, entry), os.path.join(out_path, entry))
+                    shutil.copystat(restored, out_path)
+                except BaseException as e:
+                    status = "cancelled" if isinstance(e, OperationCancelled) else "failed"
+                    self._log("decrypt", header.algorithm, "folder", status, str(e))
+                    raise
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        self._log("decrypt", header.algorithm, "folder", "success",
+                  f"{name} ({entries} entries, {counter.count} bytes)", size=counter.count)
         return out_path
 
-    def decrypt_file(self, enc_filepath: str) -> str:
-        if not os.path.exists(self.enc_key_path):
-            raise ValueError("No encryption key found. Encrypt something first.")
+    def encrypt_many(self, paths, algorithm: str, workers=None):
+        """Encrypt many files, yielding a result dict per file as each completes.
+
+        paths is a directory (walked recursively), a single file or an iterable
+        of file paths. Files are spread over a bounded pool and share the
+        cached signer and the keys from _batch_keys().
+        """
+        algorithm = self.resolve_algorithm(algorithm)
+        next_key = self._batch_keys()
+        # Output path -> the first file of the batch that writes it: report.txt
+        # and report.csv would both become report.enc.
+        outputs = {}
+
+        def encrypt(path):
+            out_path = os.path.splitext(path)[0] + ".enc"
+            owner = outputs[os.path.abspath(out_path)]
+            if owner != path:
+                raise ValueError(f"{out_path} is already written by {owner} in this batch")
+            return self._encrypt_file_with_key(algorithm, *next_key(), path, parallel=False,
+                                               out_path=out_path)
+
+        def files():
+            for path in _expand_paths(paths):
+                if not path.endswith((".enc", ".part")):
+                    outputs.setdefault(os.path.abspath(os.path.splitext(path)[0] + ".enc"), path)
+                    yield path
+        return self._run_batch(encrypt, files(), workers)
+
+    @_instrumented
+    def sync_folder(self, source: str, dest: str, algorithm: str, workers=None) -> dict:
+        """Mirror the files under source into dest as .enc files, encrypting
+        only what changed since the last sync.
+
+        sync.db in key_dir records each source file's size, mtime and SHA-256
+        when it was encrypted. A file whose size and mtime still match (and
+        whose output exists) costs one stat call. A new mtime with the same
+        size is hashed first, so touched but identical files are not
+        re-encrypted. Outputs of deleted sources are removed.
+
+        Returns counts of encrypted, unchanged and removed files, plus an
+        errors list of {"path", "error"} dicts.
+        """
+        algorithm = self.resolve_algorithm(algorithm)
+        source, dest = os.path.realpath(source), os.path.realpath(dest)
+        if not os.path.isdir(source):
+            raise ValueError(f"Not a folder: {source}")
+        if source == dest:
+            raise ValueError("Sync destination must differ from the source folder")
+
+        summary = {"encrypted": 0, "unchanged": 0, "removed": 0, "errors": []}
+        index = SyncIndex(os.path.join(self.key_dir, "sync.db"), source, dest)
+        next_key = self._batch_keys()
+        scan_errors = []
+        seen = set()
+        size = 0
+
+        def changed(known):
+            for rel, st in self._timed("read", _scan_tree(source, dest, scan_errors)):
+                seen.add(rel)
+                entry = known.get(rel)
+                if (entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns)
+                        and os.path.exists(entry[3])):
+                    summary["unchanged"] += 1
+                    continue
+                yield rel, st, entry
+
+        def sync_one(item):
+            rel, st, entry = item
+            path = os.path.join(source, rel)
+            out_path = os.path.join(dest, rel + ".enc")
+            if entry is not None and entry[0] == st.st_size and os.path.exists(out_path):
+                digest = _file_digest(path)
+                if digest == entry[2]:
+                    return digest, None
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            h = hashlib.sha256()
+            # Empty files (.gitkeep, __init__.py) are mirrored as empty containers.
+            self._encrypt_file_with_key(algorithm, *next_key(), path, parallel=False,
+                                        out_path=out_path, h=h, allow_empty=True)
+            return h.digest(), out_path
+
+        try:
+            known = index.load()
+            for result in self._run_batch(sync_one, changed(known), workers):
+                rel, st, entry = result["path"]
+                if result["status"] != "success":
+                    summary["errors"].append({"path": os.path.join(source, rel),
+                                              "error": result["error"]})
+                    continue
+                digest, out_path = result["output"]
+                if out_path is None:
+                    summary["unchanged"] += 1
+                    out_path = entry[3]
+                else:
+                    summary["encrypted"] += 1
+                    size += st.st_size
+                index.update(rel, st.st_size, st.st_mtime_ns, digest, out_path)
+
+            summary["errors"].extend(scan_errors)
+            # A folder that could not be read would look deleted: only prune
+            # outputs after a complete scan.
+            if not scan_errors:
+                for rel in known.keys() - seen:
+                    with self._phase("write"):
+                        _remove_quietly(known[rel][3])
+                    index.remove(rel)
+                    summary["removed"] += 1
+        finally:
+            index.close()
+
+        status = "failed" if summary["errors"] else "success"
+        self._log("sync", algorithm, "folder", status,
+                  f"{os.path.basename(source)}: {summary['encrypted']} encrypted, "
+                  f"{summary['unchanged']} unchanged, {summary['removed']} removed, "
+                  f"{len(summary['errors'])} failed", size=size)
+        return summary
+
+    def watch_folder(self, source: str, dest: str, algorithm: str, workers=None,
+                     queue_size=None, stop=None, batch_delay: float = 0.2) -> dict:
+        """Encrypt files written into source to dest as .enc files until the
+        stop event is set (Linux only).
+
+        inotify reports a file once its writer closes it (or it is moved in);
+        events are batched for batch_delay seconds so repeated closes become
+        one job. Jobs go through a queue of queue_size (default 4 per
+        worker) to a pool of workers; when it is full the watcher waits, and
+        the kernel holds new events meanwhile. Files already in source, and
+        the whole tree after an inotify queue overflow, are scanned and
+        encrypted if their output is missing or older.
+
+        Each file is logged as a "watch" entry whose metrics time it from
+        when it became ready, with a "queue" phase and the queue depth it
+        saw. Returns counts of encrypted and skipped files, plus an errors
+        list of {"path", "error"} dicts.
+        """
+        algorithm = self.resolve_algorithm(algorithm)
+        source, dest = os.path.realpath(source), os.path.realpath(dest)
+        if not os.path.isdir(source):
+            raise ValueError(f"Not a folder: {source}")
+        if source == dest:
+            raise ValueError("Watch destination must differ from the source folder")
+        stop = stop or threading.Event()
+        workers = max(1, workers or self.workers)
+        jobs = queue.Queue(queue_size or 4 * workers)
+        summary = {"encrypted": 0, "skipped": 0, "errors": []}
+        lock = threading.Lock()
+        next_key = self._batch_keys()
+
+        # Path -> "queued", "running", or a (ready, depth) job to run again once
+        # the running one finishes; a path is never on two workers at once.
+        states = {}
 
-        with open(self.enc_key_path, "rb") as f:
-            key = f.read()
+        def encrypt_one(path, ready, depth, again=False):
+            rel = os.path.relpath(path, source)
+            out_path = os.path.join(dest, rel + ".enc")
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                # A rerun is for a write made while the last run was encrypting,
+                # which may be older than that run's output.
+                if (not again and os.path.exists(out_path)
+                        and os.stat(out_path).st_mtime_ns >= mtime):
+                    with lock:
+                        summary["skipped"] += 1
+                    return
+            except FileNotFoundError:
+                # Deleted again before its turn came.
+                return
+            timer = self._local.timer = metrics.PhaseTimer(ready)
+            timer.phases["queue"] = time.perf_counter() - ready
+            timer.extra["queue_depth"] = depth
+            try:
+                os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                self._encrypt_file_with_key(algorithm, *next_key(), path, parallel=False,
+                                            out_path=out_path, action="watch", allow_empty=True)
+                with lock:
+                    summary["encrypted"] += 1
+            except Exception as e:
+                self._log("watch", algorithm, "file", "failed", f"{rel}: {e}")
+                with lock:
+                    summary["errors"].append({"path": path, "error": str(e)})
+            finally:
+                self._local.timer = None
 
-        with open(enc_filepath, "r") as f:
-            encrypted_data = json.loads(base64.b64decode(f.read()).decode("utf-8"))
+        def work():
+            for path, ready, depth in iter(jobs.get, None):
+                again = False
+                while True:
+                    with lock:
+                        states[path] = "running"
+                    encrypt_one(path, ready, depth, again)
+                    with lock:
+                        state = states.pop(path)
+                        if state == "running":
+                            break
+                        states[path] = "queued"
+                    (ready, depth), again = state, True
 
-        algorithm = encrypted_data["algorithm"]
-        nonce_or_iv = base64.b64decode(encrypted_data["nonce_or_iv"])
-        ct = base64.b64decode(encrypted_data["ciphertext"])
-        sig = base64.b64decode(encrypted_data["signature"])
-        original_name = encrypted_data.get("original_filename", "decrypted_file")
+        def submit(path, ready):
+            with lock:
+                state = states.get(path)
+                if state == "running":
+                    states[path] = (ready, min(jobs.qsize() + 1, jobs.maxsize))
+                if state is not None:
+                    # Queued jobs read the file when they start; running ones rerun.
+                    return
+                states[path] = "queued"
+            # Blocks while the queue is full; that is the backpressure.
+            while not stop.is_set():
+                try:
+                    jobs.put((path, ready, min(jobs.qsize() + 1, jobs.maxsize)), timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+
+        def scan():
+            errors = []
+            for rel, _ in _scan_tree(source, dest, errors):
+                submit(os.path.join(source, rel), time.perf_counter())
+            with lock:
+                summary["errors"].extend(errors)
+
+        # Watch before the first scan, so no file falls between the two.
+        watch = FolderWatch(source, dest, batch_delay)
+        pool = [threading.Thread(target=work, name=f"cipherforge-watch-{i}", daemon=True)
+                for i in range(workers)]
+        for thread in pool:
+            thread.start()
+        try:
+            scan()
+            for batch in watch.batches(stop):
+                if watch.overflowed:
+                    scan()
+                for path, ready in batch:
+                    submit(path, ready)
+        finally:
+            watch.close()
+            # Queued files are still encrypted before returning.
+            for _ in pool:
+                jobs.put(None)
+            for thread in pool:
+                thread.join()
+
+        self._log("watch", algorithm, "folder", "failed" if summary["errors"] else "success",
+                  f"{os.path.basename(source)}: {summary['encrypted']} encrypted, "
+                  f"{summary['skipped']} skipped, {len(summary['errors'])} failed")
+        return summary
+
+    def _batch_keys(self):
+        """Return a function giving (key, key_ref) for each file of a batch.
+
+        Keystore keys are shared by the whole batch (one durable write) and
+        only created when the first file needs one; in envelope mode every
+        file gets its own key, as wrapping costs only an RSA public operation.
+        """
+        if self.envelope:
+            return self._new_data_key
+        shared = []
+        lock = threading.Lock()
+
+        def next_key():
+            with lock:
+                if not shared:
+                    shared.append(self._new_data_key())
+                return shared[0]
+        return next_key
+
+    def decrypt_many(self, paths, workers=None):
+        """Decrypt many .enc files, yielding a result dict per file as each completes.
+
+        Each file's key comes from its own header (a keystore ID or a wrapped
+        key), so files from different sessions and modes can be mixed.
+        """
+        if isinstance(paths, str) and os.path.isdir(paths):
+            files = (p for p in _expand_paths(paths) if p.endswith(".enc"))
+        else:
+            files = _expand_paths(paths)
+        return self._run_batch(
+            lambda p: self._decrypt_file(p, parallel=False),
+            files, workers,
+        )
+
+    def _run_batch(self, fn, files, workers=None):
+        workers = max(1, workers or self.workers)
+        pending = {}
+        with ThreadPoolExecutor(workers, thread_name_prefix="cipherforge-batch") as pool:
+            for path in files:
+                pending[pool.submit(fn, path)] = path
+                if len(pending) >= 4 * workers:
+                    yield from _drain(pending)
+            while pending:
+                yield from _drain(pending)
+
+    def _decrypt_file_legacy(self, key: bytes, enc_filepath: str) -> str:
+        """Read the base64/JSON envelope written before the chunked container."""
+        with self._phase("read"), open(enc_filepath, "r") as f:
+            text = f.read()
+        with self._phase("encode"):
+            encrypted_data = json.loads(base64.b64decode(text).decode("utf-8"))
+            algorithm = encrypted_data["algorithm"]
+            nonce_or_iv = base64.b64decode(encrypted_data["nonce_or_iv"])
+            ct = base64.b64decode(encrypted_data["ciphertext"])
+            sig = base64.b64decode(encrypted_data["signature"])
+        original_name = os.path.basename(encrypted_data.get("original_filename", "")) or "decrypted_file"
 
         if not self._verify_sig(ct, sig):
             self._log("decrypt", algorithm, "file", "failed", "Signature verification failed")
             raise ValueError("Digital signature verification failed!")
 
-        if algorithm == "AES-GCM":
-            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce_or_iv)
-            decrypted = cipher.decrypt(ct)
-        elif algorithm == "AES-CBC":
-            cipher = AES.new(key, AES.MODE_CBC, iv=nonce_or_iv)
-            decrypted = unpad(cipher.decrypt(ct), AES.block_size)
-        elif algorithm == "ChaCha20":
-            cipher = ChaCha20.new(key=key, nonce=nonce_or_iv)
-            decrypted = cipher.decrypt(ct)
-        else:
-            raise ValueError("Unsupported algorithm")
-
-        out_dir = os.path.dirname(enc_filepath)
-        out_path = os.path.join(out_dir, original_name)
-        if os.path.exists(out_path):
-            base, ext = os.path.splitext(out_path)
-            out_path = f"{base}_decrypted{ext}"
+        with self._phase("cipher"):
+            decrypted = _decrypt_legacy(algorithm, key, nonce_or_iv, ct)
 
-        with open(out_path, "wb") as f:
-            f.write(decrypted)
+        out_path = self._decrypted_path(enc_filepath, original_name)
+        try:
+            with self._phase("write"), open(out_path, "wb") as f:
+                f.write(decrypted)
+        finally:
+            self._release(out_path)
 
-        self._log("decrypt", algorithm, "file", "success", f"{original_name}")
+        self._log("decrypt", algorithm, "file", "success", f"{original_name}", size=len(decrypted))
         return out_path
 
-    def verify_signature_text(self, ciphertext_b64: str) -> dict:
+    def _decrypted_path(self, enc_filepath: str, original_name: str) -> str:
+        """A free name for original_name beside enc_filepath, reserved until
+        _release() so concurrent batch jobs never write the same file."""
+        base, ext = os.path.splitext(os.path.join(os.path.dirname(enc_filepath), original_name))
+        names = itertools.chain([base + ext, f"{base}_decrypted{ext}"],
+                                (f"{base}_decrypted_{n}{ext}" for n in itertools.count(2)))
+        with self._claim_lock:
+            for out_path in names:
+                if out_path not in self._claimed and not os.path.exists(out_path):
+                    self._claimed.add(out_path)
+                    return out_path
+
+    def _new_directory(self, parent: str, name: str) -> str:
+        """Create an empty directory for name in parent, numbered like
+        _decrypted_path when the name is taken, and return its path."""
+        while True:
+            out_path = self._decrypted_path(os.path.join(parent, name), name)
+            try:
+                os.mkdir(out_path)
+                return out_path
+            except FileExistsError:
+                # Created by another process since _decrypted_path looked.
+                continue
+            finally:
+                self._release(out_path)
+
+    def _release(self, out_path: str):
+        with self._claim_lock:
+            self._claimed.discard(out_path)
+
+    @_instrumented
+    def verify_signature_text(self, ciphertext) -> dict:
         try:
-            data = json.loads(base64.b64decode(ciphertext_b64.strip()).decode("utf-8"))
-            ct = base64.b64decode(data["ciphertext"])
-            sig = base64.b64decode(data["signature"])
-            is_valid = self._verify_sig(ct, sig)
-            algo = data.get("algorithm", "unknown")
+            with self._phase("encode"):
+                raw = _unarmor(ciphertext)
+            if container.is_container(raw):
+                src = io.BytesIO(raw)
+                header = container.Header.read(src)
+                is_valid = self._hash_stream(header, src)
+                algo = header.algorithm
+            else:
+                data = json.loads(raw.decode("utf-8"))
+                ct = base64.b64decode(data["ciphertext"])
+                sig = base64.b64decode(data["signature"])
+                is_valid = self._verify_sig(ct, sig)
+                algo = data.get("algorithm", "unknown")
             status = "success" if is_valid else "failed"
             self._log("verify", algo, "text", status,
-                      "Valid" if is_valid else "Invalid")
+                      "Valid" if is_valid else "Invalid", size=len(raw))
             return {"valid": is_valid, "algorithm": algo}
         except Exception as e:
             self._log("verify", "unknown", "text", "error", str(e))
             return {"valid": False, "algorithm": "unknown", "error": str(e)}
 
-    def verify_signature_file(self, filepath: str) -> dict:
+    @_instrumented
+    def verify_signature_file(self, filepath: str, chunks=None, progress=None, cancel=None) -> dict:
+        """Verify a file's signature. With chunks (an iterable of chunk indices)
+        only those chunks of a Merkle container are hashed and checked.
+        progress and cancel behave as for encrypt_file."""
         try:
-            with open(filepath, "r") as f:
-                content = f.read()
-            return self.verify_signature_text(content)
+            with open(filepath, "rb") as f:
+                if not container.is_container(f.read(len(container.MAGIC))):
+                    f.seek(0)
+                    return self.verify_signature_text(f.read().decode("ascii"))
+                f.seek(0)
+                header = container.Header.read(f)
+                if chunks is not None and header.merkle:
+                    chunks = list(chunks)
+                    is_valid = self._verify_chunks(header, f, chunks)
+                    details = f"{len(chunks)} chunk(s) checked"
+                    size = len(chunks) * header.chunk_size
+                else:
+                    is_valid = self._hash_stream(header, f, progress, cancel)
+                    details = ""
+                    size = f.tell()
+            status = "success" if is_valid else "failed"
+            self._log("verify", header.algorithm, "file", status,
+                      ("Valid" if is_valid else "Invalid") + (f" ({details})" if details else ""),
+                      size=size)
+            return {"valid": is_valid, "algorithm": header.algorithm}
+        except OperationCancelled:
+            self._log("verify", "unknown", "file", "cancelled", os.path.basename(filepath))
+            raise
         except Exception as e:
             self._log("verify", "unknown", "file", "error", str(e))
             return {"valid": False, "algorithm": "unknown", "error": str(e)}
 
+    def get_metrics(self) -> dict:
+        """Aggregated timings since the engine was created.
+
+        "operations" has one row per (action, algorithm, size bucket) with the
+        count of successful runs, failures, bytes, MB/s, p50/p95/p99 latency
+        in ms and seconds spent per phase (read, cipher, hash, key_load, sign,
+        verify, encode, write). Rows of watch_folder files ("watch") time
+        them from when they became ready, with a "queue" phase and the
+        largest queue depth seen in max_queue_depth.
+        """
+        rows = self.metrics.summary()
+        total_bytes = sum(r["bytes"] for r in rows)
+        total_seconds = sum(r["seconds"] for r in rows)
+        return {
+            "operations": rows,
+            "totals": {
+                "count": sum(r["count"] for r in rows),
+                "failed": sum(r["failed"] for r in rows),
+                "bytes": total_bytes,
+                "seconds": round(total_seconds, 6),
+                "mb_per_s": round(metrics.mb_per_s(total_bytes, total_seconds), 2),
+            },
+        }
+
     def has_encryption_key(self) -> bool:
-        return os.path.exists(self.enc_key_path)
+        if self.envelope:
+            return self._backend("RSA").has_keys()
+        return self.keystore.count() > 0 or os.path.exists(self.enc_key_path)
+
+    def get_history(self, offset: int = 0, limit: int = 100, filters=None) -> list:
+        """Page through the persistent log, newest first.
+
+        filters maps action, algorithm, input_type or status to a value to
+        match, and "since"/"until" to "YYYY-MM-DD HH:MM:SS" bounds.
+        """
+        return self.history_store.query(offset, limit, filters)
+
+    def count_history(self, filters=None) -> int:
+        return self.history_store.count(filters)
+
+
+def _expand_paths(paths):
+    if isinstance(paths, str):
+        if not os.path.isdir(paths):
+            yield paths
+            return
+        for root, _, names in os.walk(paths):
+            for name in sorted(names):
+                yield os.path.join(root, name)
+    else:
+        yield from paths
+
+
+def _scan_tree(root: str, skip: str, errors: list):
+    """Yield (relative path, stat) for each file under root, not descending
+    into skip. Unreadable folders are reported in errors."""
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                entries = sorted(entries, key=lambda e: e.name)
+        except OSError as e:
+            errors.append({"path": folder, "error": str(e)})
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path != skip:
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    yield os.path.relpath(entry.path, root), entry.stat()
+            except OSError as e:
+                errors.append({"path": entry.path, "error": str(e)})
+
+
+def _file_digest(path: str) -> bytes:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.digest()
+
+
+def _drain(pending: dict):
+    """Wait for at least one future and yield result dicts for those done."""
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        path = pending.pop(future)
+        try:
+            yield {"path": path, "status": "success", "output": future.result()}
+        except Exception as e:
+            yield {"path": path, "status": "error", "output": None, "error": str(e)}
+
+
+def _reject_manifest(header):
+    if header.manifest:
+        raise ValueError("This is a backup manifest; restore it with decrypt_file")
+
+
+def _unarmor(ciphertext) -> bytes:
+    if isinstance(ciphertext, (bytes, bytearray)):
+        return bytes(ciphertext)
+    return base64.b64decode(ciphertext.strip())
+
+
+def _split_trailer(body: bytes, sig_len: int):
+    if len(body) < sig_len:
+        raise container.ContainerError("Container is truncated")
+    return body[:len(body) - sig_len], body[len(body) - sig_len:]
+
+
+def _decrypt_legacy(algorithm: str, key: bytes, nonce_or_iv: bytes, ct: bytes) -> bytes:
+    from Crypto.Cipher import AES, ChaCha20
+
+    if algorithm == "AES-GCM":
+        cipher = AES.new(key, AES.MODE_GCM, nonce=nonce_or_iv)
+        return cipher.decrypt(ct)
+    elif algorithm == "AES-CBC":
+        cipher = AES.new(key, AES.MODE_CBC, iv=nonce_or_iv)
+        return unpad(cipher.decrypt(ct), _BLOCK_SIZE)
+    elif algorithm == "ChaCha20":
+        cipher = ChaCha20.new(key=key, nonce=nonce_or_iv)
+        return cipher.decrypt(ct)
+    else:
+        raise ValueError("Unsupported algorithm")
+
+
+def _start_piped(fn, f, *args) -> Future:
+    """Run fn(f, *args) on a helper thread, closing pipe end f when it
+    returns; the Future holds its result or error."""
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(f, *args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with contextlib.suppress(OSError):
+                f.close()
+
+    threading.Thread(target=run, name="cipherforge-tar", daemon=True).start()
+    return future
+
+
+def _raise_piped(future: Future, error: BaseException):
+    """Wait for a _start_piped thread after error on the calling side; if
+    error is only the pipe breaking, raise the thread's error instead."""
+    cause = future.exception()
+    if isinstance(error, BrokenPipeError) and cause is not None:
+        raise cause
+
+
+def _write_tar(dst, root: str) -> int:
+    """Write root as a tar stream to dst; returns the number of entries."""
+    entries = 0
+
+    def count(info):
+        nonlocal entries
+        entries += 1
+        return info
+
+    with tarfile.open(fileobj=dst, mode="w|", bufsize=_TAR_BUFSIZE,
+                      copybufsize=_TAR_BUFSIZE) as tar:
+        tar.add(root, arcname=os.path.basename(root), filter=count)
+    return entries
+
+
+def _extract_tar(src, dest: str) -> int:
+    """Extract a tar stream from src into dest; returns the number of entries.
+
+    Absolute paths, ".." and links leaving dest are refused.
+    """
+    entries = 0
+    try:
+        with tarfile.open(fileobj=src, mode="r|", bufsize=_TAR_BUFSIZE) as tar:
+            for member in tar:
+                if hasattr(tarfile, "data_filter"):
+                    tar.extract(member, dest, filter="data")
+                else:
+                    _check_member(member)
+                    tar.extract(member, dest)
+                entries += 1
+    except tarfile.TarError as e:
+        raise ValueError(f"Archive is malformed: {e}")
+    # Read the record padding after the end marker so the decryptor can finish.
+    while src.read(_TAR_BUFSIZE):
+        pass
+    return entries
+
+
+def _check_member(member):
+    for name in (member.name, member.linkname if member.issym() or member.islnk() else ""):
+        if os.path.isabs(name) or ".." in name.replace("\\", "/").split("/"):
+            raise ValueError(f"Archive entry escapes the destination: {member.name}")
+    if member.isdev():
+        raise ValueError(f"Archive entry is a device: {member.name}")
+
+
+def _temp_path(out_path: str) -> str:
+    """Create an empty, uniquely named .part file beside out_path to write
+    it into before os.replace."""
+    fd, path = tempfile.mkstemp(prefix=os.path.basename(out_path) + ".", suffix=".part",
+                                dir=os.path.dirname(out_path) or ".")
+    os.close(fd)
+    return path
+
 
-    def get_history(self) -> list:
-        return self.history
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,158 @@
+"""
+CipherForge - Persistent History Store
+Append-only SQLite log of engine operations, written in batches by a
+background thread so logging never waits on disk.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+
+COLUMNS = ("timestamp", "action", "algorithm", "input_type", "status", "details")
+
+# Exact-match filter keys; "since" and "until" bound the timestamp instead.
+FILTER_COLUMNS = ("action", "algorithm", "input_type", "status")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id          INTEGER PRIMARY KEY,
+    timestamp   TEXT NOT NULL,
+    action      TEXT NOT NULL,
+    algorithm   TEXT NOT NULL,
+    input_type  TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    details     TEXT NOT NULL,
+    metrics     TEXT
+);
+CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+CREATE INDEX IF NOT EXISTS history_action ON history (action);
+CREATE INDEX IF NOT EXISTS history_algorithm ON history (algorithm);
+CREATE INDEX IF NOT EXISTS history_status ON history (status);
+"""
+
+_STOP = object()
+
+
+class HistoryStore:
+    """History rows in an SQLite database, newest first when queried.
+
+    append() only queues the entry. A writer thread commits whatever has
+    queued up (at most BATCH_SIZE rows, waiting up to LINGER seconds for more)
+    in one transaction, so a burst of operations costs one commit.
+    """
+
+    BATCH_SIZE = 500
+    LINGER = 0.05
+
+    def __init__(self, path: str):
+        self.path = path
+        self.error = None
+        self._queue = queue.Queue()
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        if "metrics" not in [row[1] for row in conn.execute("PRAGMA table_info(history)")]:
+            # Databases created before per-operation metrics were recorded
+            conn.execute("ALTER TABLE history ADD COLUMN metrics TEXT")
+        conn.close()
+        self._reader = self._connect(check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="cipherforge-history", daemon=True)
+        self._writer.start()
+
+    def append(self, entry: dict):
+        self._queue.put(entry)
+
+    def flush(self):
+        """Block until every appended entry has been committed."""
+        if self._writer.is_alive():
+            self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    def query(self, offset: int = 0, limit: int = 100, filters=None) -> list:
+        """Return up to limit entries, newest first, skipping the first offset."""
+        if offset < 0 or limit < 0:
+            raise ValueError("Offset and limit must not be negative")
+        where, params = _where(filters)
+        sql = (f"SELECT id, {', '.join(COLUMNS)}, metrics FROM history{where} "
+               f"ORDER BY id DESC LIMIT ? OFFSET ?")
+        self.flush()
+        with self._read_lock:
+            rows = self._reader.execute(sql, params + [limit, offset]).fetchall()
+        entries = []
+        for row in rows:
+            entry = dict(zip(("id",) + COLUMNS, row))
+            if row[-1] is not None:
+                entry["metrics"] = json.loads(row[-1])
+            entries.append(entry)
+        return entries
+
+    def count(self, filters=None) -> int:
+        where, params = _where(filters)
+        self.flush()
+        with self._read_lock:
+            return self._reader.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()[0]
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, timeout=5, **kwargs)
+        # WAL lets the GUI read while another engine on the same key_dir writes.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            stop = False
+            while not stop:
+                batch = [self._queue.get()]
+                while len(batch) < self.BATCH_SIZE and batch[-1] is not _STOP:
+                    try:
+                        batch.append(self._queue.get(timeout=self.LINGER))
+                    except queue.Empty:
+                        break
+                if batch[-1] is _STOP:
+                    stop = True
+                rows = [tuple(str(e.get(c, "")) for c in COLUMNS) + (_dump_metrics(e),)
+                        for e in batch if e is not _STOP]
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO history ({', '.join(COLUMNS)}, metrics) "
+                            f"VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", rows)
+                except sqlite3.Error as e:
+                    # Losing audit rows must not take the engine down with it.
+                    self.error = e
+                for _ in batch:
+                    self._queue.task_done()
+        finally:
+            conn.close()
+
+
+def _dump_metrics(entry: dict):
+    metrics = entry.get("metrics")
+    return None if metrics is None else json.dumps(metrics, separators=(",", ":"))
+
+
+def _where(filters):
+    if not filters:
+        return "", []
+    clauses, params = [], []
+    for key, value in filters.items():
+        if key in FILTER_COLUMNS:
+            clauses.append(f"{key} = ?")
+        elif key == "since":
+            clauses.append("timestamp >= ?")
+        elif key == "until":
+            clauses.append("timestamp < ?")
+        else:
+            raise ValueError(f"Unknown history filter: {key}")
+        params.append(str(value))
+    return " WHERE " + " AND ".join(clauses), params
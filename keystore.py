@@ -0,0 +1,173 @@
+"""
+CipherForge - Data Key Store
+Symmetric data keys kept in an SQLite database in key_dir under random key
+IDs, so any container can find its key again by the ID in its header.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+KEY_ID_SIZE = 16
+KEY_SIZE = 32
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS data_keys (
+    key_id   BLOB PRIMARY KEY,
+    key      BLOB NOT NULL,
+    created  TEXT NOT NULL DEFAULT (datetime('now'))
+) WITHOUT ROWID;
+"""
+
+
+class KeyCache:
+    """Thread-safe LRU of recently used data keys."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ref: bytes):
+        with self._lock:
+            key = self._keys.get(ref)
+            if key is not None:
+                self._keys.move_to_end(ref)
+            return key
+
+    def put(self, ref: bytes, key: bytes):
+        with self._lock:
+            self._keys[ref] = key
+            self._keys.move_to_end(ref)
+            while len(self._keys) > self.size:
+                self._keys.popitem(last=False)
+
+
+class KeyStore:
+    """Data keys by ID with an in-memory LRU in front of keys.db.
+
+    new_key() returns at once; a writer thread commits keys in groups with a
+    full fsync per commit, so concurrent encryptions share one disk flush.
+    Callers must wait_durable(key_id) before publishing anything encrypted
+    under the key.
+    """
+
+    CACHE_SIZE = 1024
+    LINGER = 0.005
+
+    def __init__(self, key_dir: str):
+        self.path = os.path.join(key_dir, "keys.db")
+        self.error = None
+        self._cache = KeyCache(self.CACHE_SIZE)
+        # key_id -> (sequence, key) for keys queued but not yet committed
+        self._pending = {}
+        self._queued = 0
+        self._committed = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        conn.close()
+        self._reader = self._connect(check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="cipherforge-keystore", daemon=True)
+        self._writer.start()
+
+    def new_key(self):
+        """Create, cache and queue a random data key. Returns (key_id, key)."""
+        key_id = os.urandom(KEY_ID_SIZE)
+        key = os.urandom(KEY_SIZE)
+        with self._cond:
+            if self._closed:
+                raise ValueError("Key store is closed")
+            self._queued += 1
+            self._pending[key_id] = (self._queued, key)
+            self._cond.notify_all()
+        self._cache.put(key_id, key)
+        return key_id, key
+
+    def wait_durable(self, key_id: bytes):
+        """Block until key_id has been committed to disk."""
+        with self._cond:
+            entry = self._pending.get(key_id)
+            if entry is None:
+                return
+            while self._committed < entry[0] and self.error is None:
+                self._cond.wait()
+            if self.error is not None and key_id in self._pending:
+                raise ValueError(f"Could not store data key: {self.error}")
+
+    def get(self, key_id: bytes) -> bytes:
+        key = self._cache.get(key_id)
+        if key is not None:
+            return key
+        with self._cond:
+            entry = self._pending.get(key_id)
+        if entry is not None:
+            key = entry[1]
+        else:
+            with self._read_lock:
+                row = self._reader.execute(
+                    "SELECT key FROM data_keys WHERE key_id = ?", (key_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Data key {key_id.hex()} not found in {self.path}")
+            key = row[0]
+        self._cache.put(key_id, key)
+        return key
+
+    def count(self) -> int:
+        with self._read_lock:
+            stored = self._reader.execute("SELECT COUNT(*) FROM data_keys").fetchone()[0]
+        with self._cond:
+            return stored + len(self._pending)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        with self._read_lock:
+            self._reader.close()
+
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.path, timeout=10, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Losing a key loses the data encrypted under it: fsync every commit.
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                with self._cond:
+                    while self._committed == self._queued and not self._closed:
+                        self._cond.wait()
+                    if self._committed == self._queued:
+                        return
+                    # Let concurrent callers join this commit.
+                    self._cond.wait(self.LINGER)
+                    target = self._queued
+                    batch = [(key_id, key) for key_id, (seq, key) in self._pending.items()
+                             if seq <= target]
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO data_keys (key_id, key) VALUES (?, ?)", batch)
+                except sqlite3.Error as e:
+                    with self._cond:
+                        self.error = e
+                        self._cond.notify_all()
+                    return
+                with self._cond:
+                    for key_id, _ in batch:
+                        del self._pending[key_id]
+                    self._committed = target
+                    self._cond.notify_all()
+        finally:
+            conn.close()
@@ -3,9 +3,16 @@
 CipherForge - Comprehensive Encryption Tool
 A cyberpunk-themed desktop application for AES-GCM, AES-CBC, ChaCha20
 encryption with RSA-2048 digital signatures.
+
+Run with --startup-profile to print time-to-first-frame and exit.
 """
 
+import time
+
+_STARTUP = time.perf_counter()
+
 import customtkinter as ctk
+import importlib
 import sys
 import os
 
@@ -25,11 +32,9 @@ from theme import (
     NeonButton, StatusStrip, GlowLabel,
 )
 from crypto_engine import CryptoEngine
-from panels.encrypt_panel import EncryptPanel
-from panels.decrypt_panel import DecryptPanel
-from panels.verify_panel import VerifyPanel
-from panels.keys_panel import KeysPanel
-from panels.history_panel import HistoryPanel
+from tasks import TaskRunner
+
+_IMPORTED = time.perf_counter()
 
 
 class CipherForgeApp(ctk.CTk):
@@ -39,8 +44,19 @@ class CipherForgeApp(ctk.CTk):
         ("VERIFY SIG", NEON_PURPLE, "V"),
         ("KEYS", NEON_YELLOW, "K"),
         ("HISTORY", NEON_CYAN, "H"),
+        ("METRICS", NEON_PURPLE, "M"),
     ]
 
+    # Panels are imported and built the first time their tab is opened.
+    PANEL_MODULES = {
+        "ENCRYPT": ("panels.encrypt_panel", "EncryptPanel"),
+        "DECRYPT": ("panels.decrypt_panel", "DecryptPanel"),
+        "VERIFY SIG": ("panels.verify_panel", "VerifyPanel"),
+        "KEYS": ("panels.keys_panel", "KeysPanel"),
+        "HISTORY": ("panels.history_panel", "HistoryPanel"),
+        "METRICS": ("panels.metrics_panel", "MetricsPanel"),
+    }
+
     def __init__(self):
         super().__init__()
         configure_theme()
@@ -64,6 +80,7 @@ class CipherForgeApp(ctk.CTk):
 
         self._build_ui()
         self._show_landing()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build_ui(self):
         # ── Top Navbar ──
@@ -172,8 +189,28 @@ class CipherForgeApp(ctk.CTk):
             "> rsa_key_generation: standby",
             "> awaiting_session_init_",
         ]:
-            ctk.CTkLabel(terminal, text=line, font=FONT_TINY,
-                         text_color=TEXT_DIM, anchor="w").pack(anchor="w")
+            label = ctk.CTkLabel(terminal, text=line, font=FONT_TINY,
+                                 text_color=TEXT_DIM, anchor="w")
+            label.pack(anchor="w")
+            if "key_generation" in line:
+                self.keygen_label = label
+        self._poll_keygen()
+
+    def _poll_keygen(self):
+        """Reflect the engine's background key generation on the landing screen."""
+        if self.started:
+            return
+        if not self.engine.keys_ready():
+            self.keygen_label.configure(text="> rsa_key_generation: running")
+            self.after(200, self._poll_keygen)
+            return
+        try:
+            self.engine.wait_for_keys()
+        except Exception:
+            self.keygen_label.configure(text="> rsa_key_generation: failed",
+                                        text_color=NEON_YELLOW)
+        else:
+            self.keygen_label.configure(text="> rsa_key_generation: ready")
 
     def _start_session(self):
         """Initialize session and show main workspace."""
@@ -226,12 +263,15 @@ class CipherForgeApp(ctk.CTk):
         self.panel_container = ctk.CTkFrame(self.content_area, fg_color=VOID_900, corner_radius=0)
         self.panel_container.pack(fill="both", expand=True, padx=20, pady=16)
 
-        # Create panels
-        self.panels["ENCRYPT"] = EncryptPanel(self.panel_container, self.engine, self.status_bar)
-        self.panels["DECRYPT"] = DecryptPanel(self.panel_container, self.engine, self.status_bar)
-        self.panels["VERIFY SIG"] = VerifyPanel(self.panel_container, self.engine, self.status_bar)
-        self.panels["KEYS"] = KeysPanel(self.panel_container, self.engine, self.status_bar)
-        self.panels["HISTORY"] = HistoryPanel(self.panel_container, self.engine, self.status_bar)
+    def _get_panel(self, tab_name):
+        """Return the panel for a tab, importing and building it on first use."""
+        panel = self.panels.get(tab_name)
+        if panel is None:
+            module_name, class_name = self.PANEL_MODULES[tab_name]
+            panel_class = getattr(importlib.import_module(module_name), class_name)
+            panel = panel_class(self.panel_container, self.engine, self.status_bar)
+            self.panels[tab_name] = panel
+        return panel
 
     def _switch_tab(self, tab_name):
         if self.active_tab == tab_name:
@@ -257,7 +297,7 @@ class CipherForgeApp(ctk.CTk):
                 )
 
         # Show selected panel
-        self.panels[tab_name].pack(fill="both", expand=True)
+        self._get_panel(tab_name).pack(fill="both", expand=True)
         self.active_tab = tab_name
 
         # Refresh dynamic panels
@@ -265,6 +305,13 @@ class CipherForgeApp(ctk.CTk):
             self.panels["HISTORY"].refresh()
         elif tab_name == "KEYS":
             self.panels["KEYS"].refresh()
+        elif tab_name == "METRICS":
+            self.panels["METRICS"].refresh()
+
+    def _on_close(self):
+        # Stop running engine calls between chunks so the process can exit
+        TaskRunner.cancel_all()
+        self.destroy()
 
     def _clear_active(self):
         if self.active_tab and self.active_tab in self.panels:
@@ -274,8 +321,31 @@ class CipherForgeApp(ctk.CTk):
                 self.status_bar.set_info("Panel cleared")
 
 
+def _report_startup(app, created):
+    """Print startup phase timings once the first frame has been drawn."""
+    app.update_idletasks()
+    first_frame = time.perf_counter()
+    lines = [
+        f"CipherForge startup ({'frozen' if getattr(sys, 'frozen', False) else 'script'})",
+        f"  imports          {(_IMPORTED - _STARTUP) * 1000:8.1f} ms",
+        f"  window built     {(created - _IMPORTED) * 1000:8.1f} ms",
+        f"  first frame      {(first_frame - created) * 1000:8.1f} ms",
+        f"  time to frame    {(first_frame - _STARTUP) * 1000:8.1f} ms",
+    ]
+    report = "\n".join(lines)
+    if sys.stdout is not None:
+        print(report)
+    else:
+        # A --windowed executable has no console; leave the report beside it.
+        with open(os.path.join(BASE_DIR, "startup_profile.txt"), "w") as f:
+            f.write(report + "\n")
+    app.destroy()
+
+
 def main():
     app = CipherForgeApp()
+    if "--startup-profile" in sys.argv[1:]:
+        app.after(0, _report_startup, app, time.perf_counter())
     app.mainloop()
 
 
@@ -0,0 +1,170 @@
+"""
+CipherForge - Operation Metrics
+Per-phase timers for single engine operations and aggregated latency and
+throughput per action, algorithm and input size.
+"""
+
+import math
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# (upper bound in bytes, label); the last bucket is open-ended.
+SIZE_BUCKETS = [
+    (4 * 1024, "<4 KiB"),
+    (64 * 1024, "4-64 KiB"),
+    (1024 * 1024, "64 KiB-1 MiB"),
+    (16 * 1024 * 1024, "1-16 MiB"),
+    (256 * 1024 * 1024, "16-256 MiB"),
+    (None, ">=256 MiB"),
+]
+
+
+def size_bucket(size: int) -> int:
+    """Index into SIZE_BUCKETS for a byte count."""
+    for index, (bound, _) in enumerate(SIZE_BUCKETS):
+        if bound is None or size < bound:
+            return index
+
+
+def mb_per_s(size: int, seconds: float) -> float:
+    return size / seconds / 1e6 if seconds > 0 else 0.0
+
+
+class PhaseTimer:
+    """Wall time of one operation split into named phases.
+
+    Phases nest: while an inner phase runs the outer one is paused, so the
+    phases of an operation add up to (at most) its elapsed time.
+    """
+
+    def __init__(self, started=None):
+        # started: perf_counter() time the operation began, if before now
+        # (a queued file is timed from when it became ready).
+        self.started = perf_counter() if started is None else started
+        self.phases = {}
+        # Other per-operation values stored with it, such as queue depth.
+        self.extra = {}
+        self._stack = []
+
+    @contextmanager
+    def phase(self, name: str):
+        now = perf_counter()
+        if self._stack:
+            self._stop(now)
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            self._stop(perf_counter())
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] = perf_counter()
+
+    def iterate(self, name: str, iterable):
+        """Yield from iterable, charging the time spent producing items to name."""
+        it = iter(iterable)
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.started
+
+    def snapshot(self, size: int) -> dict:
+        seconds = self.elapsed()
+        return {
+            "seconds": round(seconds, 6),
+            "bytes": size,
+            "mb_per_s": round(mb_per_s(size, seconds), 2),
+            "phases": {k: round(v, 6) for k, v in self.phases.items()},
+            **self.extra,
+        }
+
+    def _stop(self, now: float):
+        top = self._stack[-1]
+        self.phases[top[0]] = self.phases.get(top[0], 0.0) + now - top[1]
+
+
+class LatencyHistogram:
+    """Log-scale latency histogram; percentiles are accurate to one bucket (~10%)."""
+
+    BASE = 1e-5         # 10 microseconds
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+
+    def add(self, seconds: float):
+        index = max(0, int(math.log(max(seconds, self.BASE) / self.BASE, self.GROWTH)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+
+    def percentile(self, p: float) -> float:
+        """Upper bound, in seconds, of the bucket holding the p-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return self.BASE * self.GROWTH ** (index + 1)
+        return self.BASE * self.GROWTH ** (max(self.counts) + 1)
+
+
+class MetricsRegistry:
+    """Counters and latency histograms keyed by (action, algorithm, size bucket)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, action: str, algorithm: str, status: str, metrics: dict):
+        key = (action, algorithm, size_bucket(metrics["bytes"]))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "count": 0, "failed": 0, "bytes": 0, "seconds": 0.0,
+                    "phases": {}, "latency": LatencyHistogram(), "max_queue_depth": 0,
+                }
+            if status != "success":
+                # Failed and cancelled runs stop early; keep them out of latency.
+                series["failed"] += 1
+                return
+            series["count"] += 1
+            series["bytes"] += metrics["bytes"]
+            series["seconds"] += metrics["seconds"]
+            for name, seconds in metrics["phases"].items():
+                series["phases"][name] = series["phases"].get(name, 0.0) + seconds
+            series["latency"].add(metrics["seconds"])
+            if "queue_depth" in metrics:
+                series["max_queue_depth"] = max(series["max_queue_depth"], metrics["queue_depth"])
+
+    def summary(self) -> list:
+        rows = []
+        with self._lock:
+            for (action, algorithm, bucket), s in sorted(self._series.items()):
+                latency = s["latency"]
+                rows.append({
+                    "action": action,
+                    "algorithm": algorithm,
+                    "size_bucket": SIZE_BUCKETS[bucket][1],
+                    "count": s["count"],
+                    "failed": s["failed"],
+                    "bytes": s["bytes"],
+                    "seconds": round(s["seconds"], 6),
+                    "mb_per_s": round(mb_per_s(s["bytes"], s["seconds"]), 2),
+                    "p50_ms": round(latency.percentile(50) * 1000, 3),
+                    "p95_ms": round(latency.percentile(95) * 1000, 3),
+                    "p99_ms": round(latency.percentile(99) * 1000, 3),
+                    "phases": {k: round(v, 6) for k, v in s["phases"].items()},
+                    "max_queue_depth": s["max_queue_depth"],
+                })
+        return rows
@@ -10,8 +10,10 @@ from theme import (
     VOID_900, NEON_GREEN, NEON_CYAN, TEXT_MAIN, TEXT_MUTED, TEXT_DIM,
     FONT_HEADING_SM, FONT_TINY,
     NeonButton, NeonSegmentedButton, CyberTextBox, FileDropZone,
-    SectionLabel, CyberPanel, SURFACE,
+    SectionLabel, CyberPanel, ProgressStrip, SURFACE,
 )
+from crypto_engine import OperationCancelled
+from tasks import TaskRunner
 
 
 class DecryptPanel(ctk.CTkFrame):
@@ -20,6 +22,7 @@ class DecryptPanel(ctk.CTkFrame):
         self.engine = engine
         self.status_bar = status_bar
         self.input_mode = "text"
+        self.runner = TaskRunner(self)
         self._build_ui()
 
     def _build_ui(self):
@@ -84,6 +87,8 @@ class DecryptPanel(ctk.CTkFrame):
         )
         self.decrypt_btn.pack(fill="x")
 
+        self.progress = ProgressStrip(left, color=NEON_GREEN, command=self.runner.cancel)
+
         # ── Right ──
         header_right = ctk.CTkFrame(right, fg_color="transparent")
         header_right.pack(fill="x", pady=(0, 6))
@@ -124,29 +129,63 @@ class DecryptPanel(ctk.CTkFrame):
             self.file_zone.set_file(path)
 
     def _do_decrypt(self):
-        try:
-            if self.input_mode == "text":
-                ct = self.input_text.get_text()
-                if not ct:
-                    self.status_bar.set_error("Input is empty")
-                    return
-                result = self.engine.decrypt_text(ct)
-                self.output_text.configure(state="normal")
-                self.output_text.set_text(result)
-                self.output_text.configure(state="disabled")
-                self.copy_btn.pack(side="right")
-                self.status_bar.set_success("Decrypted successfully. Signature: VALID")
-            else:
-                if not self.file_zone.filepath:
-                    self.status_bar.set_error("No file selected")
-                    return
-                out_path = self.engine.decrypt_file(self.file_zone.filepath)
-                self.output_text.configure(state="normal")
-                self.output_text.set_text(f"File decrypted successfully!\n\nSaved to:\n{out_path}")
-                self.output_text.configure(state="disabled")
-                self.status_bar.set_success(f"File decrypted: {os.path.basename(out_path)}")
-        except Exception as e:
-            self.status_bar.set_error(str(e))
+        if self.runner.busy:
+            return
+        if self.input_mode == "text":
+            ct = self.input_text.get_text()
+            if not ct:
+                self.status_bar.set_error("Input is empty")
+                return
+            self._start(
+                lambda progress, cancel: self.engine.decrypt_text(ct),
+                self._on_text_decrypted,
+            )
+        else:
+            filepath = self.file_zone.filepath
+            if not filepath:
+                self.status_bar.set_error("No file selected")
+                return
+            self._start(
+                lambda progress, cancel: self.engine.decrypt_file(
+                    filepath, progress=progress, cancel=cancel),
+                self._on_file_decrypted,
+            )
+
+    def _start(self, fn, on_success):
+        self.decrypt_btn.configure(state="disabled")
+        self.progress.reset()
+        self.progress.pack(fill="x", pady=(8, 0), after=self.decrypt_btn)
+        self.status_bar.set_status("Decrypting...", NEON_GREEN)
+        self.runner.run(
+            fn,
+            lambda result: (self._finish(), on_success(result)),
+            self._on_error,
+            self.progress.set_progress,
+        )
+
+    def _finish(self):
+        self.progress.pack_forget()
+        self.decrypt_btn.configure(state="normal")
+
+    def _on_text_decrypted(self, result):
+        self.output_text.configure(state="normal")
+        self.output_text.set_text(result)
+        self.output_text.configure(state="disabled")
+        self.copy_btn.pack(side="right")
+        self.status_bar.set_success("Decrypted successfully. Signature: VALID")
+
+    def _on_file_decrypted(self, out_path):
+        self.output_text.configure(state="normal")
+        self.output_text.set_text(f"File decrypted successfully!\n\nSaved to:\n{out_path}")
+        self.output_text.configure(state="disabled")
+        self.status_bar.set_success(f"File decrypted: {os.path.basename(out_path)}")
+
+    def _on_error(self, error):
+        self._finish()
+        if isinstance(error, OperationCancelled):
+            self.status_bar.set_info("Decryption cancelled")
+        else:
+            self.status_bar.set_error(str(error))
 
     def _copy_output(self):
         self.output_text.configure(state="normal")
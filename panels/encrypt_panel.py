@@ -4,14 +4,17 @@ CipherForge - Encrypt Panel
 
 import customtkinter as ctk
 from tkinter import filedialog
+import base64
 import os
 
 from theme import (
     VOID_900, VOID_600, NEON_CYAN, NEON_GREEN, TEXT_MAIN, TEXT_MUTED, TEXT_DIM,
     FONT_HEADING_SM, FONT_LABEL, FONT_MONO, FONT_MONO_SM, FONT_TINY,
     NeonButton, NeonSegmentedButton, CyberTextBox, AlgorithmSelector,
-    FileDropZone, SectionLabel, CyberPanel, SURFACE,
+    FileDropZone, SectionLabel, CyberPanel, ProgressStrip, SURFACE,
 )
+from crypto_engine import OperationCancelled
+from tasks import TaskRunner
 
 
 class EncryptPanel(ctk.CTkFrame):
@@ -20,7 +23,15 @@ class EncryptPanel(ctk.CTkFrame):
         self.engine = engine
         self.status_bar = status_bar
         self.input_mode = "text"
+        self.runner = TaskRunner(self)
         self._build_ui()
+        # The first run benchmarks the ciphers (a fraction of a second); later
+        # runs read the cached result from key_dir.
+        TaskRunner(self).run(
+            lambda progress, cancel: (self.engine.cipher_speeds(), self.engine.auto_algorithm()),
+            lambda result: self.algo_selector.set_speeds(*result),
+            lambda e: self.status_bar.set_error(f"Cipher benchmark failed: {e}"),
+        )
 
     def _build_ui(self):
         # Header
@@ -74,6 +85,9 @@ class EncryptPanel(ctk.CTkFrame):
         )
         self.encrypt_btn.pack(fill="x", pady=(0, 0))
 
+        # Progress (shown while an encryption runs)
+        self.progress = ProgressStrip(left, color=NEON_CYAN, command=self.runner.cancel)
+
         # Input area container
         self.input_container = ctk.CTkFrame(left, fg_color="transparent")
         self.input_container.pack(fill="both", expand=True, pady=(0, 16))
@@ -138,31 +152,67 @@ class EncryptPanel(ctk.CTkFrame):
             self.file_zone.set_file(path)
 
     def _do_encrypt(self):
+        if self.runner.busy:
+            return
         algo = self.algo_selector.get()
-        try:
-            if self.input_mode == "text":
-                plaintext = self.input_text.get_text()
-                if not plaintext:
-                    self.status_bar.set_error("Input text is empty")
-                    return
-                result = self.engine.encrypt_text(algo, plaintext)
-                self.output_text.configure(state="normal")
-                self.output_text.set_text(result)
-                self.output_text.configure(state="disabled")
-                self.copy_btn.pack(side="left", padx=(0, 4))
-                self.save_btn.pack(side="left")
-                self.status_bar.set_success(f"Encrypted with {algo}")
-            else:
-                if not self.file_zone.filepath:
-                    self.status_bar.set_error("No file selected")
-                    return
-                out_path = self.engine.encrypt_file(algo, self.file_zone.filepath)
-                self.output_text.configure(state="normal")
-                self.output_text.set_text(f"File encrypted successfully!\n\nSaved to:\n{out_path}")
-                self.output_text.configure(state="disabled")
-                self.status_bar.set_success(f"File encrypted with {algo}: {os.path.basename(out_path)}")
-        except Exception as e:
-            self.status_bar.set_error(str(e))
+        if self.input_mode == "text":
+            plaintext = self.input_text.get_text()
+            if not plaintext:
+                self.status_bar.set_error("Input text is empty")
+                return
+            self._start(
+                lambda progress, cancel: self.engine.encrypt_text(algo, plaintext, armor=True),
+                lambda result: self._on_text_encrypted(algo, result),
+            )
+        else:
+            filepath = self.file_zone.filepath
+            if not filepath:
+                self.status_bar.set_error("No file selected")
+                return
+            self._start(
+                lambda progress, cancel: self.engine.encrypt_file(
+                    algo, filepath, progress=progress, cancel=cancel),
+                lambda out_path: self._on_file_encrypted(algo, out_path),
+            )
+
+    def _start(self, fn, on_success):
+        self.encrypt_btn.configure(state="disabled")
+        self.progress.reset()
+        self.progress.pack(fill="x", pady=(8, 0), after=self.encrypt_btn)
+        self.status_bar.set_status("Encrypting...", NEON_CYAN)
+        self.runner.run(
+            fn,
+            lambda result: (self._finish(), on_success(result)),
+            self._on_error,
+            self.progress.set_progress,
+        )
+
+    def _finish(self):
+        self.progress.pack_forget()
+        self.encrypt_btn.configure(state="normal")
+
+    def _on_text_encrypted(self, algo, result):
+        algo = self.engine.resolve_algorithm(algo)
+        self.output_text.configure(state="normal")
+        self.output_text.set_text(result)
+        self.output_text.configure(state="disabled")
+        self.copy_btn.pack(side="left", padx=(0, 4))
+        self.save_btn.pack(side="left")
+        self.status_bar.set_success(f"Encrypted with {algo}")
+
+    def _on_file_encrypted(self, algo, out_path):
+        algo = self.engine.resolve_algorithm(algo)
+        self.output_text.configure(state="normal")
+        self.output_text.set_text(f"File encrypted successfully!\n\nSaved to:\n{out_path}")
+        self.output_text.configure(state="disabled")
+        self.status_bar.set_success(f"File encrypted with {algo}: {os.path.basename(out_path)}")
+
+    def _on_error(self, error):
+        self._finish()
+        if isinstance(error, OperationCancelled):
+            self.status_bar.set_info("Encryption cancelled")
+        else:
+            self.status_bar.set_error(str(error))
 
     def _copy_output(self):
         self.output_text.configure(state="normal")
@@ -183,8 +233,9 @@ class EncryptPanel(ctk.CTkFrame):
                 filetypes=[("Encrypted files", "*.enc"), ("All files", "*.*")],
             )
             if path:
-                with open(path, "w") as f:
-                    f.write(text)
+                # Saved files hold the raw binary container, not its armor
+                with open(path, "wb") as f:
+                    f.write(base64.b64decode(text))
                 self.status_bar.set_success(f"Saved: {os.path.basename(path)}")
 
     def clear(self):
@@ -8,9 +8,21 @@ from theme import (
     VOID_900, VOID_600, VOID_700, NEON_CYAN, NEON_GREEN, NEON_RED,
     NEON_YELLOW, NEON_PURPLE, TEXT_MAIN, TEXT_MUTED, TEXT_DIM,
     FONT_HEADING_SM, FONT_LABEL, FONT_MONO, FONT_MONO_SM, FONT_TINY,
-    NeonButton, SectionLabel, CyberPanel, SURFACE,
+    NeonButton, NeonSegmentedButton, SectionLabel, CyberPanel, SURFACE,
 )
 
+ROW_HEIGHT = 33     # 32px row plus a 1px gap
+WHEEL_ROWS = 3
+# Rows are fetched from the engine's history store a page at a time; only
+# the last few pages are kept.
+PAGE_SIZE = 200
+MAX_PAGES = 16
+
+COLUMNS = [("TIME", 130), ("ACTION", 100), ("ALGORITHM", 110),
+           ("TYPE", 70), ("STATUS", 80), ("DETAILS", 300)]
+STATUS_COLORS = {"success": NEON_GREEN, "failed": NEON_RED}
+ACTION_COLORS = {"ENCRYPT": NEON_CYAN, "DECRYPT": NEON_GREEN, "VERIFY": NEON_PURPLE}
+
 
 class HistoryPanel(ctk.CTkFrame):
     def __init__(self, master, engine, status_bar, **kwargs):
@@ -35,111 +47,207 @@ class HistoryPanel(ctk.CTkFrame):
         title_frame.pack(side="left", fill="x", expand=True)
         ctk.CTkLabel(title_frame, text="ACTIVITY LOG", font=FONT_HEADING_SM,
                      text_color=TEXT_MAIN).pack(anchor="w")
-        ctk.CTkLabel(title_frame, text="SESSION ENCRYPTION HISTORY",
+        ctk.CTkLabel(title_frame, text="PERSISTENT ENCRYPTION HISTORY",
                      font=FONT_TINY, text_color=TEXT_MUTED).pack(anchor="w")
 
         NeonButton(header, text="REFRESH", color=NEON_CYAN, width=100, height=32,
                    command=self.refresh).pack(side="right")
 
+        # Filters are applied by the store's indexed query, not in the panel
+        filters = ctk.CTkFrame(self, fg_color="transparent")
+        filters.pack(fill="x", pady=(0, 10))
+        NeonSegmentedButton(
+            filters, values=["All", "Encrypt", "Decrypt", "Verify"],
+            command=lambda v: self._set_filter("action", v),
+        ).pack(side="left", padx=(0, 16))
+        NeonSegmentedButton(
+            filters, values=["All", "Success", "Failed"], color=NEON_GREEN,
+            command=lambda v: self._set_filter("status", v),
+        ).pack(side="left")
+
         # Table header
         table_header = ctk.CTkFrame(self, fg_color=VOID_700, corner_radius=0, height=30)
         table_header.pack(fill="x", pady=(0, 2))
         table_header.pack_propagate(False)
 
-        cols = [("TIME", 80), ("ACTION", 100), ("ALGORITHM", 110),
-                ("TYPE", 70), ("STATUS", 80), ("DETAILS", 300)]
-        for text, width in cols:
+        for text, width in COLUMNS:
             ctk.CTkLabel(
                 table_header, text=text, font=FONT_TINY, text_color=TEXT_MUTED,
                 width=width, anchor="w",
             ).pack(side="left", padx=(8, 0))
 
-        # Scrollable rows
-        self.rows_frame = ctk.CTkScrollableFrame(
-            self, fg_color=VOID_900, corner_radius=0,
-            scrollbar_button_color=NEON_CYAN_DIM,
-            scrollbar_button_hover_color=NEON_CYAN,
+        # Virtualized rows: a fixed pool of row widgets covers the viewport and
+        # is refilled from pages of engine.get_history() as the list scrolls.
+        body = ctk.CTkFrame(self, fg_color=VOID_900, corner_radius=0)
+        body.pack(fill="both", expand=True)
+
+        self.scrollbar = ctk.CTkScrollbar(
+            body, command=self._on_scrollbar,
+            button_color=NEON_CYAN_DIM, button_hover_color=NEON_CYAN,
         )
-        self.rows_frame.pack(fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.viewport = ctk.CTkFrame(body, fg_color=VOID_900, corner_radius=0)
+        self.viewport.pack(side="left", fill="both", expand=True)
+        self.viewport.bind("<Configure>", self._on_resize)
+        self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_wheel, add="+")
+
+        self.empty = ctk.CTkFrame(self.viewport, fg_color="transparent")
+        ctk.CTkLabel(self.empty, text="[ EMPTY ]", font=FONT_HEADING_SM,
+                     text_color=TEXT_DIM).pack()
+        ctk.CTkLabel(self.empty, text="No activity recorded yet", font=FONT_MONO,
+                     text_color=TEXT_DIM).pack(pady=(8, 0))
+        ctk.CTkLabel(self.empty, text="Encrypt or decrypt data to see activity here",
+                     font=FONT_TINY, text_color=TEXT_DIM).pack()
+
+        self._rows = []
+        self._filters = {}
+        self._count = 0     # entries matching the filters at the last refresh
+        self._pages = {}    # page number -> entries, newest first
+        self._top = 0       # index (newest first) of the first visible entry
 
         self.refresh()
 
     def refresh(self):
-        for w in self.rows_frame.winfo_children():
-            w.destroy()
-
-        history = self.engine.get_history()
-
-        if not history:
-            empty = ctk.CTkFrame(self.rows_frame, fg_color="transparent")
-            empty.pack(fill="both", expand=True, pady=60)
-            ctk.CTkLabel(empty, text="[ EMPTY ]", font=FONT_HEADING_SM,
-                         text_color=TEXT_DIM).pack()
-            ctk.CTkLabel(empty, text="No activity recorded yet", font=FONT_MONO,
-                         text_color=TEXT_DIM).pack(pady=(8, 0))
-            ctk.CTkLabel(empty, text="Encrypt or decrypt data to see activity here",
-                         font=FONT_TINY, text_color=TEXT_DIM).pack()
-            return
+        """Re-count the stored history and redraw the viewport."""
+        count = self.engine.count_history(self._filters)
+        if count != self._count:
+            # Offsets count from the newest entry, so every cached page moved
+            self._pages.clear()
+            # Keep the rows the user scrolled to in place as new ones arrive on top
+            if self._top:
+                self._top += count - self._count
+            self._count = count
+        self._render()
+
+    def _set_filter(self, key, value):
+        if value == "All":
+            self._filters.pop(key, None)
+        else:
+            self._filters[key] = value.lower()
+        self._pages.clear()
+        self._top = 0
+        self._count = 0
+        self.refresh()
 
-        for item in history:
-            row = ctk.CTkFrame(self.rows_frame, fg_color="transparent",
-                               corner_radius=0, height=32)
-            row.pack(fill="x", pady=(0, 1))
-            row.pack_propagate(False)
-
-            # Status color for row border
-            status = item.get("status", "")
-            if status == "success":
-                border_color = NEON_GREEN
-                status_color = NEON_GREEN
-            elif status == "failed":
-                border_color = NEON_RED
-                status_color = NEON_RED
+    def _entry(self, index):
+        page, slot = divmod(index, PAGE_SIZE)
+        if page not in self._pages:
+            if len(self._pages) >= MAX_PAGES:
+                self._pages.clear()
+            self._pages[page] = self.engine.get_history(page * PAGE_SIZE, PAGE_SIZE,
+                                                        self._filters)
+        entries = self._pages[page]
+        return entries[slot] if slot < len(entries) else None
+
+    def _full_rows(self) -> int:
+        return max(1, self.viewport.winfo_height() // ROW_HEIGHT)
+
+    def _on_resize(self, event):
+        needed = event.height // ROW_HEIGHT + 1
+        while len(self._rows) < needed:
+            self._rows.append(_HistoryRow(self.viewport, len(self._rows)))
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self._scroll_to(round(float(args[1]) * self._count))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._full_rows()
+            self._scroll_to(self._top + step)
+
+    def _on_wheel(self, event):
+        if not str(event.widget).startswith(str(self.viewport)):
+            return
+        # X11 sends Button-4/5; Windows and macOS send a signed delta
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        self._scroll_to(self._top + (-WHEEL_ROWS if up else WHEEL_ROWS))
+
+    def _scroll_to(self, top):
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _render(self):
+        count = self._count
+        full = self._full_rows()
+        self._top = max(0, min(self._top, count - full))
+
+        if count:
+            self.empty.place_forget()
+        else:
+            self.empty.place(relx=0.5, y=60, anchor="n")
+
+        for i, row in enumerate(self._rows):
+            index = self._top + i
+            item = self._entry(index) if index < count else None
+            if item is not None:
+                row.show(item)
             else:
-                border_color = NEON_YELLOW
-                status_color = NEON_YELLOW
-
-            # Left accent bar
-            accent = ctk.CTkFrame(row, fg_color=border_color, width=2, corner_radius=0)
-            accent.pack(side="left", fill="y")
-
-            # Time
-            ctk.CTkLabel(
-                row, text=item.get("timestamp", ""), font=FONT_TINY,
-                text_color=TEXT_MUTED, width=80, anchor="w",
-            ).pack(side="left", padx=(8, 0))
-
-            # Action
-            action = item.get("action", "").upper()
-            action_colors = {"ENCRYPT": NEON_CYAN, "DECRYPT": NEON_GREEN, "VERIFY": NEON_PURPLE}
-            ctk.CTkLabel(
-                row, text=action, font=FONT_TINY,
-                text_color=action_colors.get(action, TEXT_MUTED), width=100, anchor="w",
-            ).pack(side="left", padx=(8, 0))
-
-            # Algorithm
-            ctk.CTkLabel(
-                row, text=item.get("algorithm", ""), font=FONT_TINY,
-                text_color=NEON_CYAN, width=110, anchor="w",
-            ).pack(side="left", padx=(8, 0))
-
-            # Type
-            ctk.CTkLabel(
-                row, text=item.get("input_type", "").upper(), font=FONT_TINY,
-                text_color=TEXT_MUTED, width=70, anchor="w",
-            ).pack(side="left", padx=(8, 0))
-
-            # Status
-            ctk.CTkLabel(
-                row, text=status.upper(), font=FONT_TINY,
-                text_color=status_color, width=80, anchor="w",
-            ).pack(side="left", padx=(8, 0))
-
-            # Details
-            ctk.CTkLabel(
-                row, text=item.get("details", ""), font=FONT_TINY,
-                text_color=TEXT_DIM, width=300, anchor="w",
-            ).pack(side="left", padx=(8, 0))
+                row.hide()
+
+        if count:
+            self.scrollbar.set(self._top / count, min(1.0, (self._top + full) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+class _HistoryRow(ctk.CTkFrame):
+    """One pooled table row; show() only reconfigures widgets that changed."""
+
+    def __init__(self, master, slot):
+        super().__init__(master, fg_color="transparent", corner_radius=0,
+                         height=ROW_HEIGHT - 1)
+        self.pack_propagate(False)
+        self.slot = slot
+        self.item = None
+        self.visible = False
+
+        # Left accent bar
+        self.accent = ctk.CTkFrame(self, fg_color=NEON_YELLOW, width=2, corner_radius=0)
+        self.accent.pack(side="left", fill="y")
+
+        self.labels = []
+        for _, width in COLUMNS:
+            label = ctk.CTkLabel(self, text="", font=FONT_TINY, text_color=TEXT_MUTED,
+                                 width=width, anchor="w")
+            label.pack(side="left", padx=(8, 0))
+            self.labels.append(label)
+
+    def show(self, item):
+        if not self.visible:
+            self.place(x=0, y=self.slot * ROW_HEIGHT, relwidth=1.0)
+            self.visible = True
+        if item == self.item:
+            return
+        self.item = item
+
+        # Status color for row border
+        status = item.get("status", "")
+        status_color = STATUS_COLORS.get(status, NEON_YELLOW)
+        action = item.get("action", "").upper()
+        self.accent.configure(fg_color=status_color)
+
+        cells = [
+            (item.get("timestamp", ""), TEXT_MUTED),
+            (action, ACTION_COLORS.get(action, TEXT_MUTED)),
+            (item.get("algorithm", ""), NEON_CYAN),
+            (item.get("input_type", "").upper(), TEXT_MUTED),
+            (status.upper(), status_color),
+            (item.get("details", ""), TEXT_DIM),
+        ]
+        for label, (text, color) in zip(self.labels, cells):
+            label.configure(text=text, text_color=color)
+
+    def hide(self):
+        if self.visible:
+            self.place_forget()
+            self.visible = False
+            self.item = None
 
 
 # Need the dim constant
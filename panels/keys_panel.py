@@ -10,6 +10,7 @@ from theme import (
     FONT_HEADING_SM, FONT_LABEL, FONT_MONO, FONT_MONO_SM, FONT_TINY,
     NeonButton, CyberTextBox, SectionLabel, CyberPanel, SURFACE,
 )
+from tasks import TaskRunner
 
 
 class KeysPanel(ctk.CTkFrame):
@@ -17,6 +18,7 @@ class KeysPanel(ctk.CTkFrame):
         super().__init__(master, fg_color="transparent", **kwargs)
         self.engine = engine
         self.status_bar = status_bar
+        self.runner = TaskRunner(self)
         self._build_ui()
 
     def _build_ui(self):
@@ -108,12 +110,18 @@ class KeysPanel(ctk.CTkFrame):
         self.key_text = CyberTextBox(right, height=360, text_color=NEON_GREEN)
         self.key_text.pack(fill="both", expand=True)
 
-        try:
-            pub_key = self.engine.get_public_key()
-            self.key_text.set_text(pub_key)
-        except Exception:
-            self.key_text.set_text("Failed to load public key")
+        # The key pair may still be generating; load it without blocking the UI.
+        self.key_text.set_text("Generating key pair...")
+        self.key_text.configure(state="disabled")
+        self.runner.run(
+            lambda progress, cancel: self.engine.get_public_key(),
+            self._show_key,
+            lambda e: self._show_key("Failed to load public key"),
+        )
 
+    def _show_key(self, text):
+        self.key_text.configure(state="normal")
+        self.key_text.set_text(text)
         self.key_text.configure(state="disabled")
 
     def _update_key_status(self):
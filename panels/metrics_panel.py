@@ -0,0 +1,116 @@
+"""
+CipherForge - Operation Metrics Panel
+"""
+
+import customtkinter as ctk
+
+from theme import (
+    VOID_900, VOID_700, NEON_CYAN, NEON_CYAN_DIM, NEON_GREEN, NEON_PURPLE,
+    TEXT_MAIN, TEXT_MUTED, TEXT_DIM,
+    FONT_HEADING_SM, FONT_MONO, FONT_TINY,
+    NeonButton,
+)
+
+COLUMNS = [("ACTION", 70), ("ALGORITHM", 90), ("SIZE", 100), ("COUNT", 60),
+           ("MB/S", 70), ("P50 MS", 70), ("P95 MS", 70), ("P99 MS", 70), ("TIME BY PHASE", 260)]
+ACTION_COLORS = {"ENCRYPT": NEON_CYAN, "DECRYPT": NEON_GREEN, "VERIFY": NEON_PURPLE}
+
+
+class MetricsPanel(ctk.CTkFrame):
+    def __init__(self, master, engine, status_bar, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.engine = engine
+        self.status_bar = status_bar
+        self._build_ui()
+
+    def _build_ui(self):
+        # Header
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.pack(fill="x", pady=(0, 16))
+
+        icon_frame = ctk.CTkFrame(header, fg_color=VOID_900, border_color=NEON_PURPLE,
+                                   border_width=1, corner_radius=0, width=36, height=36)
+        icon_frame.pack(side="left", padx=(0, 12))
+        icon_frame.pack_propagate(False)
+        ctk.CTkLabel(icon_frame, text="M", font=FONT_HEADING_SM, text_color=NEON_PURPLE).place(
+            relx=0.5, rely=0.5, anchor="center")
+
+        title_frame = ctk.CTkFrame(header, fg_color="transparent")
+        title_frame.pack(side="left", fill="x", expand=True)
+        ctk.CTkLabel(title_frame, text="OPERATION METRICS", font=FONT_HEADING_SM,
+                     text_color=TEXT_MAIN).pack(anchor="w")
+        self.totals_label = ctk.CTkLabel(title_frame, text="", font=FONT_TINY,
+                                         text_color=TEXT_MUTED)
+        self.totals_label.pack(anchor="w")
+
+        NeonButton(header, text="REFRESH", color=NEON_PURPLE, width=100, height=32,
+                   command=self.refresh).pack(side="right")
+
+        # Table header
+        table_header = ctk.CTkFrame(self, fg_color=VOID_700, corner_radius=0, height=30)
+        table_header.pack(fill="x", pady=(0, 2))
+        table_header.pack_propagate(False)
+        for text, width in COLUMNS:
+            ctk.CTkLabel(
+                table_header, text=text, font=FONT_TINY, text_color=TEXT_MUTED,
+                width=width, anchor="w",
+            ).pack(side="left", padx=(8, 0))
+
+        # One row per (action, algorithm, size bucket), so the table stays small
+        self.rows_frame = ctk.CTkScrollableFrame(
+            self, fg_color=VOID_900, corner_radius=0,
+            scrollbar_button_color=NEON_CYAN_DIM,
+            scrollbar_button_hover_color=NEON_CYAN,
+        )
+        self.rows_frame.pack(fill="both", expand=True)
+
+        self.refresh()
+
+    def refresh(self):
+        for w in self.rows_frame.winfo_children():
+            w.destroy()
+
+        metrics = self.engine.get_metrics()
+        totals = metrics["totals"]
+        self.totals_label.configure(
+            text=f"SESSION  //  {totals['count']} OK  {totals['failed']} FAILED  "
+                 f"//  {totals['bytes'] / 1e6:.1f} MB  @  {totals['mb_per_s']:.1f} MB/S")
+
+        if not metrics["operations"]:
+            empty = ctk.CTkFrame(self.rows_frame, fg_color="transparent")
+            empty.pack(fill="both", expand=True, pady=60)
+            ctk.CTkLabel(empty, text="[ NO DATA ]", font=FONT_HEADING_SM,
+                         text_color=TEXT_DIM).pack()
+            ctk.CTkLabel(empty, text="Timings appear here after the first operation",
+                         font=FONT_MONO, text_color=TEXT_DIM).pack(pady=(8, 0))
+            return
+
+        for op in metrics["operations"]:
+            row = ctk.CTkFrame(self.rows_frame, fg_color="transparent",
+                               corner_radius=0, height=32)
+            row.pack(fill="x", pady=(0, 1))
+            row.pack_propagate(False)
+
+            action = op["action"].upper()
+            phases = sorted(op["phases"].items(), key=lambda kv: kv[1], reverse=True)
+            total = sum(seconds for _, seconds in phases) or 1.0
+            breakdown = "  ".join(f"{name} {seconds / total:.0%}" for name, seconds in phases[:4])
+            if op["failed"]:
+                breakdown = f"({op['failed']} failed)  " + breakdown
+
+            cells = [
+                (action, ACTION_COLORS.get(action, TEXT_MUTED)),
+                (op["algorithm"], NEON_CYAN),
+                (op["size_bucket"], TEXT_MUTED),
+                (str(op["count"]), TEXT_MAIN),
+                (f"{op['mb_per_s']:.1f}", NEON_GREEN),
+                (f"{op['p50_ms']:.2f}", TEXT_MUTED),
+                (f"{op['p95_ms']:.2f}", TEXT_MUTED),
+                (f"{op['p99_ms']:.2f}", TEXT_MUTED),
+                (breakdown, TEXT_DIM),
+            ]
+            for (text, color), (_, width) in zip(cells, COLUMNS):
+                ctk.CTkLabel(
+                    row, text=text, font=FONT_TINY, text_color=color,
+                    width=width, anchor="w",
+                ).pack(side="left", padx=(8, 0))
@@ -10,8 +10,10 @@ from theme import (
     NEON_RED_DIM, TEXT_MAIN, TEXT_MUTED, TEXT_DIM,
     FONT_HEADING_SM, FONT_HEADING, FONT_LABEL, FONT_TINY, FONT_MONO,
     NeonButton, NeonSegmentedButton, CyberTextBox, FileDropZone,
-    SectionLabel, CyberPanel, SURFACE,
+    SectionLabel, CyberPanel, ProgressStrip, SURFACE,
 )
+from crypto_engine import OperationCancelled
+from tasks import TaskRunner
 
 
 class VerifyPanel(ctk.CTkFrame):
@@ -20,6 +22,7 @@ class VerifyPanel(ctk.CTkFrame):
         self.engine = engine
         self.status_bar = status_bar
         self.input_mode = "text"
+        self.runner = TaskRunner(self)
         self._build_ui()
 
     def _build_ui(self):
@@ -81,6 +84,8 @@ class VerifyPanel(ctk.CTkFrame):
         )
         self.verify_btn.pack(fill="x")
 
+        self.progress = ProgressStrip(left, color=NEON_PURPLE, command=self.runner.cancel)
+
         # ── Right - Result Display ──
         self.result_frame = ctk.CTkFrame(right, fg_color="transparent")
         self.result_frame.pack(fill="both", expand=True)
@@ -159,27 +164,48 @@ class VerifyPanel(ctk.CTkFrame):
             self.file_zone.set_file(path)
 
     def _do_verify(self):
-        try:
-            if self.input_mode == "text":
-                ct = self.input_text.get_text()
-                if not ct:
-                    self.status_bar.set_error("Input is empty")
-                    return
-                result = self.engine.verify_signature_text(ct)
-            else:
-                if not self.file_zone.filepath:
-                    self.status_bar.set_error("No file selected")
-                    return
-                result = self.engine.verify_signature_file(self.file_zone.filepath)
-
-            self._show_result(result["valid"], result.get("algorithm", "unknown"))
-
-            if result["valid"]:
-                self.status_bar.set_success("Signature verified successfully!")
-            else:
-                self.status_bar.set_error("Signature verification FAILED")
-        except Exception as e:
-            self.status_bar.set_error(str(e))
+        if self.runner.busy:
+            return
+        if self.input_mode == "text":
+            ct = self.input_text.get_text()
+            if not ct:
+                self.status_bar.set_error("Input is empty")
+                return
+            fn = lambda progress, cancel: self.engine.verify_signature_text(ct)
+        else:
+            filepath = self.file_zone.filepath
+            if not filepath:
+                self.status_bar.set_error("No file selected")
+                return
+            fn = lambda progress, cancel: self.engine.verify_signature_file(
+                filepath, progress=progress, cancel=cancel)
+
+        self.verify_btn.configure(state="disabled")
+        self.progress.reset()
+        self.progress.pack(fill="x", pady=(8, 0), after=self.verify_btn)
+        self.status_bar.set_status("Verifying...", NEON_PURPLE)
+        self.runner.run(fn, self._on_verified, self._on_error, self.progress.set_progress)
+
+    def _finish(self):
+        self.progress.pack_forget()
+        self.verify_btn.configure(state="normal")
+
+    def _on_verified(self, result):
+        self._finish()
+        self._show_result(result["valid"], result.get("algorithm", "unknown"))
+
+        if result["valid"]:
+            self.status_bar.set_success("Signature verified successfully!")
+        else:
+            self.status_bar.set_error("Signature verification FAILED")
+
+    def _on_error(self, error):
+        self._finish()
+        if isinstance(error, OperationCancelled):
+            self.status_bar.set_info("Verification cancelled")
+            self._show_empty_state()
+        else:
+            self.status_bar.set_error(str(error))
             self._show_result(False)
 
     def clear(self):
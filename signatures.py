@@ -0,0 +1,199 @@
+"""
+CipherForge - Signature Backends
+RSA-2048 PKCS#1 v1.5, Ed25519 and ECDSA P-256 signers with cached key objects.
+The RSA pair also wraps data keys (OAEP) for envelope encryption.
+"""
+
+import os
+import tempfile
+import threading
+
+# pycryptodome modules are imported inside the methods that need them so that
+# creating an engine (and the GUI's first frame) does not pay for loading them.
+
+
+class SignatureBackend:
+    """Key pair stored as PEM files in key_dir plus the scheme that uses it.
+
+    Imported keys and scheme objects are cached and re-imported only when a
+    PEM file's inode, mtime or size changes.
+    """
+
+    name = ""
+    private_name = ""
+    public_name = ""
+
+    def __init__(self, key_dir: str):
+        self.private_key_path = os.path.join(key_dir, self.private_name)
+        self.public_key_path = os.path.join(key_dir, self.public_name)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def has_keys(self) -> bool:
+        return os.path.exists(self.private_key_path) and os.path.exists(self.public_key_path)
+
+    def ensure_keys(self):
+        if not self.has_keys():
+            private_pem, public_pem = self._generate()
+            # Each file is written under a unique temporary name and replaced
+            # atomically, so an interrupted run never leaves a truncated PEM
+            # behind and concurrent runs never write into the same file.
+            for path, pem in ((self.private_key_path, private_pem),
+                              (self.public_key_path, public_pem)):
+                fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".",
+                                                suffix=".tmp", dir=os.path.dirname(path))
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(pem)
+                    os.replace(tmp_path, path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+
+    def reload(self):
+        with self._lock:
+            self._cache.clear()
+
+    def load(self, private: bool = True):
+        """Import (or fetch from the cache) the private or public key."""
+        return self._cached(self.private_key_path if private else self.public_key_path)[0]
+
+    def new_hash(self, data: bytes = b""):
+        from Crypto.Hash import SHA256
+
+        return SHA256.new(data)
+
+    def sign(self, h) -> bytes:
+        return self._cached(self.private_key_path)[1].sign(h)
+
+    def verify(self, h, signature: bytes) -> bool:
+        scheme = self._cached(self.public_key_path)[1]
+        try:
+            scheme.verify(h, signature)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+    def signature_size(self) -> int:
+        raise NotImplementedError
+
+    def _generate(self):
+        raise NotImplementedError
+
+    def _import(self, pem: str):
+        raise NotImplementedError
+
+    def _cached(self, path: str):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            raise ValueError(f"No {self.name} key found: {os.path.basename(path)}")
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        entry = self._cache.get(path)
+        if entry is None or entry[0] != stamp:
+            with self._lock:
+                entry = self._cache.get(path)
+                if entry is None or entry[0] != stamp:
+                    with open(path, "r") as f:
+                        key, scheme = self._import(f.read())
+                    entry = (stamp, key, scheme)
+                    self._cache[path] = entry
+        return entry[1], entry[2]
+
+
+class RSABackend(SignatureBackend):
+    name = "RSA"
+    private_name = "private_key.pem"
+    public_name = "public_key.pem"
+
+    def signature_size(self) -> int:
+        return self._cached(self.private_key_path)[0].size_in_bytes()
+
+    def wrap(self, data_key: bytes) -> bytes:
+        """Encrypt a data key to the public key with RSA-OAEP (SHA-256)."""
+        from Crypto.Cipher import PKCS1_OAEP
+        from Crypto.Hash import SHA256
+
+        return PKCS1_OAEP.new(self.load(private=False), hashAlgo=SHA256).encrypt(data_key)
+
+    def unwrap(self, wrapped: bytes) -> bytes:
+        from Crypto.Cipher import PKCS1_OAEP
+        from Crypto.Hash import SHA256
+
+        try:
+            return PKCS1_OAEP.new(self.load(), hashAlgo=SHA256).decrypt(wrapped)
+        except (ValueError, TypeError):
+            raise ValueError("Could not unwrap the data key: it was not wrapped "
+                             "for this RSA key pair")
+
+    def _generate(self):
+        from Crypto.PublicKey import RSA
+
+        key = RSA.generate(2048)
+        return key.export_key(), key.publickey().export_key()
+
+    def _import(self, pem: str):
+        from Crypto.PublicKey import RSA
+        from Crypto.Signature import pkcs1_15
+
+        key = RSA.import_key(pem)
+        return key, pkcs1_15.new(key)
+
+
+class Ed25519Backend(SignatureBackend):
+    name = "Ed25519"
+    private_name = "ed25519_private.pem"
+    public_name = "ed25519_public.pem"
+
+    def new_hash(self, data: bytes = b""):
+        # Ed25519ph: signing a prehash keeps the streaming, hash-object API.
+        from Crypto.Hash import SHA512
+
+        return SHA512.new(data)
+
+    def signature_size(self) -> int:
+        return 64
+
+    def _generate(self):
+        from Crypto.PublicKey import ECC
+
+        key = ECC.generate(curve="Ed25519")
+        return (key.export_key(format="PEM").encode("ascii"),
+                key.public_key().export_key(format="PEM").encode("ascii"))
+
+    def _import(self, pem: str):
+        from Crypto.PublicKey import ECC
+        from Crypto.Signature import eddsa
+
+        key = ECC.import_key(pem)
+        return key, eddsa.new(key, "rfc8032")
+
+
+class ECDSABackend(SignatureBackend):
+    name = "ECDSA-P256"
+    private_name = "ecdsa_p256_private.pem"
+    public_name = "ecdsa_p256_public.pem"
+
+    def signature_size(self) -> int:
+        return 64
+
+    def _generate(self):
+        from Crypto.PublicKey import ECC
+
+        key = ECC.generate(curve="P-256")
+        return (key.export_key(format="PEM").encode("ascii"),
+                key.public_key().export_key(format="PEM").encode("ascii"))
+
+    def _import(self, pem: str):
+        from Crypto.PublicKey import ECC
+        from Crypto.Signature import DSS
+
+        key = ECC.import_key(pem)
+        return key, DSS.new(key, "fips-186-3")
+
+
+BACKENDS = {
+    RSABackend.name: RSABackend,
+    Ed25519Backend.name: Ed25519Backend,
+    ECDSABackend.name: ECDSABackend,
+}
@@ -0,0 +1,82 @@
+"""
+CipherForge - Folder Sync Index
+What each synced source file looked like when it was last encrypted: size,
+mtime and content hash, against the .enc output written for it. Stored in
+SQLite in key_dir so an unchanged tree syncs with stat calls alone.
+"""
+
+import sqlite3
+from datetime import datetime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS synced_files (
+    source_root  TEXT NOT NULL,
+    dest_root    TEXT NOT NULL,
+    rel_path     TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    sha256       BLOB NOT NULL,
+    output       TEXT NOT NULL,
+    synced       TEXT NOT NULL,
+    PRIMARY KEY (source_root, dest_root, rel_path)
+) WITHOUT ROWID;
+"""
+
+
+class SyncIndex:
+    """Index rows for one (source, destination) pair of folders.
+
+    Updates are buffered and written BATCH_SIZE at a time in one
+    transaction; close() writes the rest.
+    """
+
+    BATCH_SIZE = 256
+
+    def __init__(self, path: str, source_root: str, dest_root: str):
+        self.path = path
+        self.source_root = source_root
+        self.dest_root = dest_root
+        self._pending = []
+        self._conn = sqlite3.connect(path, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def load(self) -> dict:
+        """rel_path -> (size, mtime_ns, sha256, output) for every indexed file."""
+        rows = self._conn.execute(
+            "SELECT rel_path, size, mtime_ns, sha256, output FROM synced_files "
+            "WHERE source_root = ? AND dest_root = ?", (self.source_root, self.dest_root))
+        return {rel: (size, mtime_ns, digest, output)
+                for rel, size, mtime_ns, digest, output in rows}
+
+    def update(self, rel_path: str, size: int, mtime_ns: int, digest: bytes, output: str):
+        self._pending.append(("update", (self.source_root, self.dest_root, rel_path, size,
+                                         mtime_ns, digest, output,
+                                         datetime.now().strftime("%Y-%m-%d %H:%M:%S"))))
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.flush()
+
+    def remove(self, rel_path: str):
+        self._pending.append(("remove", (self.source_root, self.dest_root, rel_path)))
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        with self._conn:
+            for kind, params in self._pending:
+                if kind == "update":
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO synced_files (source_root, dest_root, rel_path, "
+                        "size, mtime_ns, sha256, output, synced) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        params)
+                else:
+                    self._conn.execute(
+                        "DELETE FROM synced_files "
+                        "WHERE source_root = ? AND dest_root = ? AND rel_path = ?", params)
+        self._pending.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
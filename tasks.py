@@ -0,0 +1,78 @@
+"""
+CipherForge - Background Tasks
+Runs engine calls off the Tk main thread so the window stays responsive.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    """Runs one task at a time for a widget on a shared worker pool.
+
+    Tk is not thread-safe, so the worker never touches widgets: the runner
+    polls the task from the main loop with after() and delivers progress and
+    the result there.
+    """
+
+    POLL_MS = 50
+    _executor = None
+    _active = set()
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._future = None
+        self._cancel = None
+        self._progress = None
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    def run(self, fn, on_success, on_error, on_progress=None):
+        """Call fn(progress, cancel) on a worker thread.
+
+        progress(done, total) may be called from the worker; on_progress(done,
+        total) then receives the latest value on the main thread. cancel is a
+        threading.Event set by cancel().
+        """
+        if self.busy:
+            raise RuntimeError("A task is already running")
+        if TaskRunner._executor is None:
+            TaskRunner._executor = ThreadPoolExecutor(2, thread_name_prefix="cipherforge-ui")
+
+        self._cancel = threading.Event()
+        self._progress = None
+        TaskRunner._active.add(self)
+        self._future = TaskRunner._executor.submit(fn, self._report, self._cancel)
+        self.widget.after(self.POLL_MS, self._poll, on_success, on_error, on_progress)
+
+    def cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+
+    @classmethod
+    def cancel_all(cls):
+        for runner in list(cls._active):
+            runner.cancel()
+
+    def _report(self, done, total):
+        self._progress = (done, total)
+
+    def _poll(self, on_success, on_error, on_progress):
+        if on_progress is not None and self._progress is not None:
+            on_progress(*self._progress)
+        if not self._future.done():
+            self.widget.after(self.POLL_MS, self._poll, on_success, on_error, on_progress)
+            return
+
+        future = self._future
+        self._future = None
+        self._cancel = None
+        TaskRunner._active.discard(self)
+        try:
+            result = future.result()
+        except Exception as e:
+            on_error(e)
+        else:
+            on_success(result)
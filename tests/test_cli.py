@@ -0,0 +1,38 @@
+"""
+CipherForge - command line tests
+Run from the repository root with: python -m unittest discover tests
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cipherforge.py")
+
+
+class StreamTests(unittest.TestCase):
+    def setUp(self):
+        self.key_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.key_dir.cleanup)
+
+    def run_cli(self, *args, data: bytes = b"") -> bytes:
+        result = subprocess.run([sys.executable, CLI, "--key-dir", self.key_dir.name, *args],
+                                input=data, capture_output=True)
+        self.assertEqual(result.returncode, 0, result.stderr.decode(errors="replace"))
+        return result.stdout
+
+    def test_empty_stdin_round_trips(self):
+        sealed = self.run_cli("encrypt", "-")
+        self.assertTrue(sealed)
+        self.assertEqual(self.run_cli("decrypt", "-", data=sealed), b"")
+
+    def test_stdin_round_trips(self):
+        data = os.urandom(100000)
+        sealed = self.run_cli("encrypt", "-", data=data)
+        self.assertEqual(self.run_cli("decrypt", "-", data=sealed), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -282,28 +282,72 @@ class StatusStrip(ctk.CTkFrame):
         self.set_info(text, NEON_RED)
 
 
+class ProgressStrip(ctk.CTkFrame):
+    """Progress bar with percentage and cancel button for background tasks."""
+
+    def __init__(self, master, color=NEON_CYAN, command=None, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+
+        self.bar = ctk.CTkProgressBar(
+            self, progress_color=color, fg_color=VOID_700, corner_radius=0, height=6,
+        )
+        self.bar.pack(side="left", fill="x", expand=True, padx=(0, 8))
+
+        self.label = ctk.CTkLabel(self, text="", font=FONT_TINY, text_color=TEXT_MUTED, width=40)
+        self.label.pack(side="left", padx=(0, 8))
+
+        self.cancel_btn = NeonButton(self, text="CANCEL", color=NEON_RED, width=70, height=26,
+                                     command=command)
+        self.cancel_btn.pack(side="right")
+        self.reset()
+
+    def set_progress(self, done, total):
+        if total:
+            fraction = min(done / total, 1.0)
+            self.bar.set(fraction)
+            self.label.configure(text=f"{fraction * 100:.0f}%")
+        else:
+            self.label.configure(text=f"{done / (1024 * 1024):.0f} MB")
+
+    def reset(self):
+        self.bar.set(0)
+        self.label.configure(text="")
+
+
 class AlgorithmSelector(ctk.CTkFrame):
-    """Three-option algorithm selector with descriptions."""
+    """Algorithm selector with descriptions and measured throughput.
+
+    AUTO leaves the choice to the engine's cached cipher benchmark; call
+    set_speeds() once the benchmark is available to show MB/s per option.
+    """
 
     ALGOS = [
+        ("AUTO", "Fastest authenticated", NEON_YELLOW),
         ("AES-GCM", "Authenticated encryption", NEON_CYAN),
         ("AES-CBC", "Block cipher mode", NEON_PURPLE),
         ("ChaCha20", "Stream cipher", NEON_GREEN),
+        ("ChaCha20-Poly1305", "Authenticated stream", NEON_GREEN),
     ]
+    COLUMNS = 3
 
     def __init__(self, master, command=None, **kwargs):
         super().__init__(master, fg_color="transparent", **kwargs)
         self.selected = ctk.StringVar(value="AES-GCM")
         self._command = command
         self._buttons = []
+        self._speed_labels = {}
 
-        for algo, desc, color in self.ALGOS:
+        for column in range(self.COLUMNS):
+            self.grid_columnconfigure(column, weight=1, uniform="algo")
+
+        for i, (algo, desc, color) in enumerate(self.ALGOS):
             frame = ctk.CTkFrame(self, fg_color="transparent", border_color=VOID_600,
                                  border_width=1, corner_radius=0)
-            frame.pack(side="left", padx=(0, 6), fill="x", expand=True)
+            frame.grid(row=i // self.COLUMNS, column=i % self.COLUMNS,
+                       padx=(0, 6), pady=(0, 6), sticky="nsew")
 
             inner = ctk.CTkFrame(frame, fg_color="transparent")
-            inner.pack(padx=12, pady=8)
+            inner.pack(padx=12, pady=8, anchor="w")
 
             name_lbl = ctk.CTkLabel(inner, text=algo, font=FONT_LABEL, text_color=TEXT_MUTED, anchor="w")
             name_lbl.pack(anchor="w")
@@ -311,15 +355,28 @@ class AlgorithmSelector(ctk.CTkFrame):
             desc_lbl = ctk.CTkLabel(inner, text=desc, font=FONT_TINY, text_color=TEXT_DIM, anchor="w")
             desc_lbl.pack(anchor="w")
 
+            speed_lbl = ctk.CTkLabel(inner, text="-- MB/S", font=FONT_TINY, text_color=TEXT_DIM, anchor="w")
+            speed_lbl.pack(anchor="w")
+            self._speed_labels[algo] = speed_lbl
+
             self._buttons.append((algo, color, frame, name_lbl))
 
             # Make the whole frame clickable
-            for widget in [frame, inner, name_lbl, desc_lbl]:
+            for widget in [frame, inner, name_lbl, desc_lbl, speed_lbl]:
                 widget.bind("<Button-1>", lambda e, a=algo: self._select(a))
                 widget.configure(cursor="hand2")
 
+        self._speed_labels["AUTO"].configure(text="BENCHMARKING...")
         self._update_visuals()
 
+    def set_speeds(self, speeds: dict, best: str):
+        """Show MB/s per algorithm; best is what AUTO resolves to."""
+        for algo, label in self._speed_labels.items():
+            if algo == "AUTO":
+                label.configure(text=f"-> {best}")
+            elif algo in speeds:
+                label.configure(text=f"{speeds[algo]:.0f} MB/S")
+
     def _select(self, algo):
         self.selected.set(algo)
         self._update_visuals()
@@ -0,0 +1,157 @@
+"""
+CipherForge - Watch Folder
+Linux inotify bindings (through ctypes, no extra packages) and a recursive
+folder watch that reports files once their writer has closed them.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+from time import perf_counter
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# A file is ready when its writer closes it or it is moved in complete;
+# IN_CREATE is only needed to follow new subfolders.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+
+_EVENT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class Inotify:
+    """An inotify instance: add_watch() folders, read() their events."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError(errno.ENOSYS, "Watch folders need Linux inotify")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._check(self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        return self._check(self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask))
+
+    def read(self, timeout: float) -> list:
+        """Events as (wd, mask, name) tuples; waits up to timeout seconds."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def _check(self, result: int) -> int:
+        if result < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        return result
+
+
+class FolderWatch:
+    """Watch a folder tree and group ready files into batches.
+
+    Events that arrive within batch_delay of the first one pending are
+    merged, so a file closed several times is reported once. A new
+    subfolder is watched as soon as it appears and the files already in it
+    are reported too. skip is a folder (such as the output folder) to
+    ignore.
+    """
+
+    def __init__(self, root: str, skip: str = "", batch_delay: float = 0.2):
+        self.root = root
+        self.skip = skip
+        self.batch_delay = batch_delay
+        self.overflowed = False
+        self._inotify = Inotify()
+        self._folders = {}
+        self._pending = {}
+        self._add_tree(root, report=False)
+
+    def batches(self, stop, poll: float = 0.5):
+        """Yield lists of (path, ready time) until the stop event is set.
+
+        Ready times are perf_counter() values. After a kernel queue overflow
+        events were lost: an empty batch is yielded with overflowed set, and
+        the caller should rescan the tree.
+        """
+        while not stop.is_set():
+            now = perf_counter()
+            if self._pending:
+                first = min(self._pending.values())
+                timeout = max(0.0, first + self.batch_delay - now)
+            else:
+                timeout = poll
+            for wd, mask, name in self._inotify.read(timeout):
+                self._handle(wd, mask, name)
+            if self.overflowed:
+                yield []
+                self.overflowed = False
+            if self._pending and perf_counter() >= min(self._pending.values()) + self.batch_delay:
+                batch = sorted(self._pending.items(), key=lambda item: item[1])
+                self._pending.clear()
+                yield batch
+
+    def close(self):
+        self._inotify.close()
+
+    def _handle(self, wd: int, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            self.overflowed = True
+            return
+        if mask & IN_IGNORED:
+            self._folders.pop(wd, None)
+            return
+        folder = self._folders.get(wd)
+        if folder is None:
+            return
+        path = os.path.join(folder, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO) and path != self.skip:
+                self._add_tree(path, report=True)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._pending.setdefault(path, perf_counter())
+
+    def _add_tree(self, root: str, report: bool):
+        """Watch root and the folders below it; with report, queue their files."""
+        stack = [root]
+        while stack:
+            folder = stack.pop()
+            try:
+                self._folders[self._inotify.add_watch(folder)] = folder
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.path != self.skip:
+                                stack.append(entry.path)
+                        elif report and entry.is_file(follow_symlinks=False):
+                            self._pending.setdefault(entry.path, perf_counter())
+            except OSError:
+                # Removed (or made unreadable) before it could be watched.
+                continue